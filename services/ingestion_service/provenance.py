@@ -1,12 +1,15 @@
 from datetime import datetime
 from typing import Dict, Any
 
+_utcnow = datetime.utcnow
+
 class ProvenanceTracker:
     @staticmethod
     def create_provenance(source_id: str, url: str, confidence_delta: float = 0.0) -> Dict[str, Any]:
         return {
             "source_id": source_id,
             "url": url,
-            "ingested_at": datetime.utcnow().isoformat(),
+            # Second precision is plenty for ingestion audit trails
+            "ingested_at": _utcnow().isoformat(timespec="seconds"),
             "confidence_adjustment": confidence_delta
         }
@@ -17,8 +17,9 @@ New:
 
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Tuple
 from datetime import datetime, timedelta
+from enum import IntEnum
 import json
 import os
 import logging
@@ -86,6 +87,22 @@ CONSEC_LOSS_COOLDOWN_SEC = 600  # 10 min after 2+ consecutive losses
 MAX_SAME_STRIKE_PER_DAY = 2   # Max entries at same strike/direction per day
 
 
+class RejectReason(IntEnum):
+    """Machine-readable place_trade rejection code, returned next to the text reason."""
+    DELTA_LOW = 1
+    DELTA_HIGH = 2
+    GAMMA_LOW = 3
+    THETA_HIGH = 4
+    PREMIUM_CHEAP = 5
+    COOLDOWN = 6
+    STRIKE_LIMIT = 7
+    RISK_GATE = 8
+    MAX_TRADES = 9
+    POSITION_OPEN = 10
+    PAST_CUTOFF = 11
+    CAPITAL_CAP = 12
+
+
 # ──────────────────────────────────────────────────────────────────
 # Data Models
 # ──────────────────────────────────────────────────────────────────
@@ -127,6 +144,34 @@ learning_engine = SelfLearningEngine(data_dir=DATA_DIR)
 metrics_engine = MetricsEngine(data_dir=DATA_DIR)
 
 
+def _contract_rejection(
+    entry_premium: float, greeks: Optional[dict],
+) -> Optional[Tuple[RejectReason, str]]:
+    """
+    Stateless contract gate: greeks (delta / gamma / theta) then minimum premium.
+    Returns (code, reason) for the first failed check, or None if the contract is tradeable.
+    """
+    if greeks:
+        delta_abs = abs(greeks.get("delta", 0.5))
+        gamma_val = abs(greeks.get("gamma", 0.001))
+        theta_val = abs(greeks.get("theta", 0))
+
+        if delta_abs < MIN_DELTA_ABS:
+            return RejectReason.DELTA_LOW, f"Delta {delta_abs:.3f} < {MIN_DELTA_ABS} — too far OTM, low probability of profit"
+        if delta_abs > MAX_DELTA_ABS:
+            return RejectReason.DELTA_HIGH, f"Delta {delta_abs:.3f} > {MAX_DELTA_ABS} — too deep ITM, poor risk/reward"
+        if gamma_val < MIN_GAMMA:
+            return RejectReason.GAMMA_LOW, f"Gamma {gamma_val:.5f} < {MIN_GAMMA} — insufficient delta sensitivity"
+        if entry_premium > 0 and theta_val > 0:
+            theta_pct = (theta_val / entry_premium) * 100
+            if theta_pct > MAX_THETA_PCT_OF_PREMIUM:
+                return RejectReason.THETA_HIGH, f"Theta decay {theta_pct:.1f}%/day > {MAX_THETA_PCT_OF_PREMIUM}% — rapid time decay"
+
+    if entry_premium < MIN_PREMIUM:
+        return RejectReason.PREMIUM_CHEAP, f"Premium ₹{entry_premium:.2f} < ₹{MIN_PREMIUM} — too cheap, wide spreads"
+    return None
+
+
 # ──────────────────────────────────────────────────────────────────
 # Paper Trading Engine (kept, enhanced with v2 fields)
 # ──────────────────────────────────────────────────────────────────
@@ -244,17 +289,17 @@ class PaperTradingEngine:
         # v2: Portfolio-level risk gate
         can_trade, reason = risk_engine.check_can_trade(is_option=True)
         if not can_trade:
-            return {"status": "rejected", "reason": reason}
+            return {"status": "rejected", "reason": reason, "reason_code": RejectReason.RISK_GATE}
 
         if self.day_trade_count >= MAX_TRADES_PER_DAY:
-            return {"status": "rejected", "reason": f"Max {MAX_TRADES_PER_DAY} trades/day reached"}
+            return {"status": "rejected", "reason": f"Max {MAX_TRADES_PER_DAY} trades/day reached", "reason_code": RejectReason.MAX_TRADES}
 
         if len(self.active_trades) > 0:
-            return {"status": "rejected", "reason": "Close existing position before opening new"}
+            return {"status": "rejected", "reason": "Close existing position before opening new", "reason_code": RejectReason.POSITION_OPEN}
 
         now = self._get_current_time()
         if (now.hour > SQUARE_OFF_HOUR) or (now.hour == SQUARE_OFF_HOUR and now.minute >= SQUARE_OFF_MIN):
-            return {"status": "rejected", "reason": "Past intraday cutoff (3:15 PM)"}
+            return {"status": "rejected", "reason": "Past intraday cutoff (3:15 PM)", "reason_code": RejectReason.PAST_CUTOFF}
 
         # ── Cooldown after consecutive losses ──
         if self._last_loss_time > 0:
@@ -262,39 +307,25 @@ class PaperTradingEngine:
             cooldown = CONSEC_LOSS_COOLDOWN_SEC if self._consecutive_losses >= 2 else LOSS_COOLDOWN_SEC
             if elapsed < cooldown:
                 remaining = int(cooldown - elapsed)
-                return {"status": "rejected", "reason": f"Cooldown active: {remaining}s remaining after {self._consecutive_losses} consecutive loss(es)"}
+                return {"status": "rejected", "reason": f"Cooldown active: {remaining}s remaining after {self._consecutive_losses} consecutive loss(es)", "reason_code": RejectReason.COOLDOWN}
 
         # ── Per-strike daily limit ──
         strike_key = f"{strike}-{direction}"
         entries_today = self._daily_strike_entries.get(strike_key, 0)
         if entries_today >= MAX_SAME_STRIKE_PER_DAY:
-            return {"status": "rejected", "reason": f"Max {MAX_SAME_STRIKE_PER_DAY} entries per day for {direction} {strike}"}
-
-        # ── Greeks validation ──
-        if greeks:
-            delta_abs = abs(greeks.get("delta", 0.5))
-            gamma_val = abs(greeks.get("gamma", 0.001))
-            theta_val = abs(greeks.get("theta", 0))
-
-            if delta_abs < MIN_DELTA_ABS:
-                return {"status": "rejected", "reason": f"Delta {delta_abs:.3f} < {MIN_DELTA_ABS} — too far OTM, low probability of profit"}
-            if delta_abs > MAX_DELTA_ABS:
-                return {"status": "rejected", "reason": f"Delta {delta_abs:.3f} > {MAX_DELTA_ABS} — too deep ITM, poor risk/reward"}
-            if gamma_val < MIN_GAMMA:
-                return {"status": "rejected", "reason": f"Gamma {gamma_val:.5f} < {MIN_GAMMA} — insufficient delta sensitivity"}
-            if entry_premium > 0 and theta_val > 0:
-                theta_pct = (theta_val / entry_premium) * 100
-                if theta_pct > MAX_THETA_PCT_OF_PREMIUM:
-                    return {"status": "rejected", "reason": f"Theta decay {theta_pct:.1f}%/day > {MAX_THETA_PCT_OF_PREMIUM}% — rapid time decay"}
-
-        if entry_premium < MIN_PREMIUM:
-            return {"status": "rejected", "reason": f"Premium ₹{entry_premium:.2f} < ₹{MIN_PREMIUM} — too cheap, wide spreads"}
+            return {"status": "rejected", "reason": f"Max {MAX_SAME_STRIKE_PER_DAY} entries per day for {direction} {strike}", "reason_code": RejectReason.STRIKE_LIMIT}
+
+        # ── Greeks / premium validation ──
+        contract_rejection = _contract_rejection(entry_premium, greeks)
+        if contract_rejection:
+            code, reason = contract_rejection
+            return {"status": "rejected", "reason": reason, "reason_code": code}
 
         # Capital gate: max 20% per trade
         max_cost = self.capital * risk_engine.config.max_capital_per_trade_pct
         trade_cost = entry_premium * NIFTY_LOT_SIZE * lots
         if trade_cost > max_cost:
-            return {"status": "rejected", "reason": f"Cost ₹{trade_cost:,.0f} > {risk_engine.config.max_capital_per_trade_pct*100:.0f}% cap ₹{max_cost:,.0f}"}
+            return {"status": "rejected", "reason": f"Cost ₹{trade_cost:,.0f} > {risk_engine.config.max_capital_per_trade_pct*100:.0f}% cap ₹{max_cost:,.0f}", "reason_code": RejectReason.CAPITAL_CAP}
 
         # Simulate slippage
         slippage_pct = _random.uniform(SLIPPAGE_MIN, SLIPPAGE_MAX)
@@ -714,7 +745,7 @@ def _fetch_nse_option_oi(spot: float) -> dict:
     all_candles = market_store.get_candles()
     if all_candles and len(all_candles) >= 2:
         recent_vol = all_candles[-1].volume
-        avg_vol = sum(c.volume for c in all_candles) / len(all_candles)
+        avg_vol = market_store.avg_volume()
         vol_ratio = recent_vol / avg_vol if avg_vol > 0 else 1.0
 
         # Estimate OI change from volume (muted range vs random)
@@ -894,10 +925,7 @@ def _signal_loop():
             ind = market_store.indicators
 
             # ── Regime classification ──
-            candles = market_store.get_candles(n=3)
-            range_3 = 0
-            if len(candles) >= 3:
-                range_3 = max(c.high for c in candles[-3:]) - min(c.low for c in candles[-3:])
+            range_3 = market_store.range_last_n(3) if market_store.candle_count >= 3 else 0
 
             regime_result = regime_engine.classify(
                 spot=spot,
@@ -923,7 +951,7 @@ def _signal_loop():
 
             # Average volume for spike calculation
             all_candles = market_store.get_candles()
-            avg_vol = sum(c.volume for c in all_candles) / max(1, len(all_candles)) if all_candles else 100000
+            avg_vol = market_store.avg_volume(default=100000)
 
             # OI data — GAP-1: fetch real OI from NSE option chain
             oi_data = _fetch_nse_option_oi(spot)
@@ -1129,7 +1157,7 @@ def _risk_loop():
 
                 # Volume ratio for momentum failure
                 all_candles = market_store.get_candles()
-                avg_vol = sum(c.volume for c in all_candles) / max(1, len(all_candles)) if all_candles else 100000
+                avg_vol = market_store.avg_volume(default=100000)
                 last_vol = all_candles[-1].volume if all_candles else avg_vol
                 vol_ratio = last_vol / avg_vol if avg_vol > 0 else 1
 
@@ -1218,7 +1246,7 @@ async def get_momentum_signal():
     candles = market_store.get_candles()
     if not candles:
         return {"signal": None, "message": "No candle data yet"}
-    avg_vol = sum(c.volume for c in candles) / max(1, len(candles))
+    avg_vol = market_store.avg_volume()
     signal = momentum_engine.evaluate(
         ind=ind, candles=candles, volume_avg=avg_vol, is_option=True,
     )
@@ -456,10 +456,7 @@ async def get_regime(symbol: str = "NIFTY"):
     spot = ind.spot or 0
     if spot <= 0:
         return {"regime": "UNKNOWN", "message": "No candle data"}
-    candles = store.get_candles(n=3)
-    range_3 = 0
-    if len(candles) >= 3:
-        range_3 = max(c.high for c in candles[-3:]) - min(c.low for c in candles[-3:])
+    range_3 = store.range_last_n(3) if store.candle_count >= 3 else 0
     result = equity_regime_engine.classify(
         spot=spot,
         vwap=ind.vwap if ind.vwap > 0 else spot,
@@ -479,7 +476,7 @@ async def get_momentum_signal(symbol: str = "NIFTY"):
     if not candles:
         return {"signal": None, "message": "No candle data"}
     ind = store.indicators
-    avg_vol = sum(c.volume for c in candles) / max(1, len(candles))
+    avg_vol = store.avg_volume()
     signal = equity_momentum_engine.evaluate(
         ind=ind, candles=candles, volume_avg=avg_vol, is_option=False,
     )
@@ -45,7 +45,7 @@ class SliceStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderSlice:
     """A single child order within an iceberg."""
     slice_id: str
@@ -156,33 +156,30 @@ class IcebergEngine:
         else:
             max_slice_qty = IcebergEngine.STOCK_MAX_QTY_PER_SLICE
 
-        # Generate slices
-        slices = []
-        remaining = total_quantity
-        sequence = 0
-
-        while remaining > 0:
-            slice_qty = min(remaining, max_slice_qty)
-
-            # Progressive price improvement: slightly better price for later slices
-            # BUY: lower price for later slices (willing to wait for dip)
-            # SELL: higher price for later slices (willing to wait for uptick)
-            improvement = sequence * (price_improvement_pct / 100) * base_price
-            if trade_type.upper() == "BUY":
-                slice_price = round(base_price - improvement, 2)
-            else:
-                slice_price = round(base_price + improvement, 2)
-
-            slice_id = f"{iceberg_id}-S{sequence:02d}"
-            slices.append(OrderSlice(
-                slice_id=slice_id,
+        # Slice sizes: full slices plus one remainder slice
+        n_full, last_qty = divmod(total_quantity, max_slice_qty) if total_quantity > 0 else (0, 0)
+        quantities = [max_slice_qty] * n_full
+        if last_qty:
+            quantities.append(last_qty)
+
+        # Progressive price improvement: slightly better price for later slices
+        # BUY: lower price for later slices (willing to wait for dip)
+        # SELL: higher price for later slices (willing to wait for uptick)
+        improvement_frac = price_improvement_pct / 100
+        is_buy = trade_type.upper() == "BUY"
+        slices = [
+            OrderSlice(
+                slice_id=f"{iceberg_id}-S{sequence:02d}",
                 sequence=sequence,
                 quantity=slice_qty,
-                price=slice_price,
-            ))
-
-            remaining -= slice_qty
-            sequence += 1
+                price=round(
+                    base_price - sequence * improvement_frac * base_price if is_buy
+                    else base_price + sequence * improvement_frac * base_price,
+                    2,
+                ),
+            )
+            for sequence, slice_qty in enumerate(quantities)
+        ]
 
         order = IcebergOrder(
             iceberg_id=iceberg_id,
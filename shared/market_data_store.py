@@ -21,7 +21,43 @@ import threading
 from collections import deque
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional
+from itertools import islice
+from typing import Iterable, List, Optional
+
+
+def _tail(series, n: int) -> list:
+    """Last *n* items of a deque in order — walks from the right end, O(n)."""
+    out = list(islice(reversed(series), n))
+    out.reverse()
+    return out
+
+
+def _atr_kernel(highs: List[float], lows: List[float], closes: List[float]) -> float:
+    """Mean True Range over bars 1..n-1 of equal-length columns (n >= 2)."""
+    total = 0.0
+    prev_close = closes[0]
+    for i in range(1, len(closes)):
+        h = highs[i]
+        lo = lows[i]
+        total += max(h - lo, abs(h - prev_close), abs(lo - prev_close))
+        prev_close = closes[i]
+    return total / (len(closes) - 1)
+
+
+def _rsi_from_deltas(deltas) -> float:
+    """Simple-average RSI over a window of close-to-close deltas."""
+    gain = 0.0
+    loss = 0.0
+    for delta in deltas:
+        if delta >= 0:
+            gain += delta
+        else:
+            loss -= delta
+    if loss == 0:
+        return 100.0
+    period = len(deltas)
+    rs = (gain / period) / (loss / period)
+    return 100.0 - 100.0 / (1.0 + rs)
 
 
 @dataclass
@@ -36,9 +72,9 @@ class Candle:
     oi: int = 0           # open interest (options)
 
 
-@dataclass
+@dataclass(slots=True)
 class DerivedIndicators:
-    """Cached indicator snapshot — refreshed each candle."""
+    """Cached indicator snapshot — refreshed each candle (slotted: written ~12× per bar)."""
     atr_14: float = 0.0
     vwap: float = 0.0
     vwap_slope: float = 0.0        # per-minute slope over last 10 min
@@ -66,19 +102,29 @@ class MarketDataStore:
     """
 
     MAX_CANDLES = 120   # 2 hours of 1-min bars
+    ATR_PERIOD = 14
+    RSI_PERIOD = 7
 
     def __init__(self, symbol: str = ""):
         self.symbol = symbol
         self._candles: deque[Candle] = deque(maxlen=self.MAX_CANDLES)
+        # Column views of the window — indicators read plain floats, not Candle attrs
+        self._highs: deque[float] = deque(maxlen=self.MAX_CANDLES)
+        self._lows: deque[float] = deque(maxlen=self.MAX_CANDLES)
+        self._closes: deque[float] = deque(maxlen=self.MAX_CANDLES)
+        self._volumes: deque[int] = deque(maxlen=self.MAX_CANDLES)
         self._lock = threading.Lock()
         self._indicators = DerivedIndicators()
+        # Incremental ATR / RSI inputs — only the bars the indicators average
+        self._trs: deque[float] = deque(maxlen=self.ATR_PERIOD)
+        self._deltas: deque[float] = deque(maxlen=self.RSI_PERIOD)
         # Internal EMA state
         self._ema_prev: Optional[float] = None
-        self._ema_history: List[float] = []
+        self._ema_history: deque[float] = deque(maxlen=self.MAX_CANDLES)
         # VWAP accumulators (reset each session)
         self._vwap_cum_vol: float = 0.0
         self._vwap_cum_pv: float = 0.0
-        self._vwap_history: List[float] = []
+        self._vwap_history: deque[float] = deque(maxlen=self.MAX_CANDLES)
         # OR tracking
         self._session_start_minute: Optional[int] = None
 
@@ -90,9 +136,25 @@ class MarketDataStore:
         """Append a 1-min candle and recompute all indicators."""
         with self._lock:
             self._candles.append(candle)
+            self._highs.append(candle.high)
+            self._lows.append(candle.low)
+            self._closes.append(candle.close)
+            self._volumes.append(candle.volume)
             self._recompute(candle)
             return self._indicators
 
+    def add_candles(self, candles: Iterable[Candle]) -> DerivedIndicators:
+        """Append a batch of 1-min candles in order (one lock acquisition)."""
+        with self._lock:
+            for candle in candles:
+                self._candles.append(candle)
+                self._highs.append(candle.high)
+                self._lows.append(candle.low)
+                self._closes.append(candle.close)
+                self._volumes.append(candle.volume)
+                self._recompute(candle)
+            return self._indicators
+
     @property
     def indicators(self) -> DerivedIndicators:
         return self._indicators
@@ -100,9 +162,24 @@ class MarketDataStore:
     def get_candles(self, n: int = 0) -> List[Candle]:
         """Return last *n* candles (or all if n <= 0)."""
         with self._lock:
-            if n <= 0:
+            total = len(self._candles)
+            if n <= 0 or n >= total:
                 return list(self._candles)
-            return list(self._candles)[-n:]
+            return _tail(self._candles, n)
+
+    def avg_volume(self, default: float = 0.0) -> float:
+        """Mean volume over the stored window (*default* when empty)."""
+        with self._lock:
+            if not self._volumes:
+                return default
+            return sum(self._volumes) / len(self._volumes)
+
+    def range_last_n(self, n: int) -> float:
+        """High-low range over the last *n* candles (0.0 when empty)."""
+        with self._lock:
+            if not self._highs:
+                return 0.0
+            return max(islice(reversed(self._highs), n)) - min(islice(reversed(self._lows), n))
 
     @property
     def candle_count(self) -> int:
@@ -112,6 +189,12 @@ class MarketDataStore:
         """Call at 9:15 AM (or new session) to reset VWAP / OR."""
         with self._lock:
             self._candles.clear()
+            self._highs.clear()
+            self._lows.clear()
+            self._closes.clear()
+            self._volumes.clear()
+            self._trs.clear()
+            self._deltas.clear()
             self._indicators = DerivedIndicators()
             self._ema_prev = None
             self._ema_history.clear()
@@ -125,15 +208,25 @@ class MarketDataStore:
     # ------------------------------------------------------------------
 
     def _recompute(self, latest: Candle) -> None:
-        candles = list(self._candles)
-        n = len(candles)
+        n = len(self._candles)
         if n == 0:
             return
 
         self._indicators.spot = latest.close
+        if n >= 2:
+            prev_close = self._closes[-2]
+            self._trs.append(max(
+                latest.high - latest.low,
+                abs(latest.high - prev_close),
+                abs(latest.low - prev_close),
+            ))
+            self._deltas.append(latest.close - prev_close)
 
         # ── ATR(14) ──
-        self._indicators.atr_14 = self._calc_atr(candles, period=14)
+        if self._trs:
+            self._indicators.atr_14 = sum(self._trs) / len(self._trs)
+        else:
+            self._indicators.atr_14 = latest.high - latest.low
 
         # ── VWAP + slope ──
         self._update_vwap(latest)
@@ -145,33 +238,17 @@ class MarketDataStore:
         self._indicators.ema_slope = self._calc_slope(self._ema_history, window=3)
 
         # ── RSI(7) ──
-        self._indicators.rsi_7 = self._calc_rsi(candles, period=7)
+        self._indicators.rsi_7 = (
+            _rsi_from_deltas(self._deltas) if len(self._deltas) == self.RSI_PERIOD else 50.0
+        )
 
         # ── 15-min rolling high / low ──
-        last15 = candles[-15:] if n >= 15 else candles
-        self._indicators.high_15m = max(c.high for c in last15)
-        self._indicators.low_15m = min(c.low for c in last15)
+        self._indicators.high_15m = max(islice(reversed(self._highs), 15))
+        self._indicators.low_15m = min(islice(reversed(self._lows), 15))
 
         # ── Opening Range (first 15 min) ──
         self._update_or(latest)
 
-    # ---- ATR ----
-    @staticmethod
-    def _calc_atr(candles: List[Candle], period: int = 14) -> float:
-        if len(candles) < 2:
-            return candles[0].high - candles[0].low if candles else 0.0
-        trs: List[float] = []
-        for i in range(1, len(candles)):
-            prev_close = candles[i - 1].close
-            c = candles[i]
-            tr = max(c.high - c.low, abs(c.high - prev_close), abs(c.low - prev_close))
-            trs.append(tr)
-        if not trs:
-            return 0.0
-        # Simple moving average of True Range for the last *period* bars
-        window = trs[-period:]
-        return sum(window) / len(window)
-
     # ---- VWAP ----
     def _update_vwap(self, c: Candle) -> None:
         typical = (c.high + c.low + c.close) / 3.0
@@ -180,8 +257,6 @@ class MarketDataStore:
         self._vwap_cum_vol += vol
         vwap = self._vwap_cum_pv / self._vwap_cum_vol if self._vwap_cum_vol else typical
         self._vwap_history.append(vwap)
-        if len(self._vwap_history) > 120:
-            self._vwap_history = self._vwap_history[-120:]
 
     def _current_vwap(self) -> float:
         return self._vwap_history[-1] if self._vwap_history else 0.0
@@ -194,37 +269,12 @@ class MarketDataStore:
         else:
             self._ema_prev = close * k + self._ema_prev * (1 - k)
         self._ema_history.append(self._ema_prev)
-        if len(self._ema_history) > 120:
-            self._ema_history = self._ema_history[-120:]
         return self._ema_prev
 
-    # ---- RSI ----
-    @staticmethod
-    def _calc_rsi(candles: List[Candle], period: int = 7) -> float:
-        if len(candles) < period + 1:
-            return 50.0
-        closes = [c.close for c in candles]
-        gains: List[float] = []
-        losses: List[float] = []
-        for i in range(len(closes) - period, len(closes)):
-            delta = closes[i] - closes[i - 1]
-            if delta >= 0:
-                gains.append(delta)
-                losses.append(0.0)
-            else:
-                gains.append(0.0)
-                losses.append(-delta)
-        avg_gain = sum(gains) / period if gains else 0
-        avg_loss = sum(losses) / period if losses else 0
-        if avg_loss == 0:
-            return 100.0
-        rs = avg_gain / avg_loss
-        return 100.0 - 100.0 / (1.0 + rs)
-
     # ---- Slope (linear regression per minute) ----
     @staticmethod
-    def _calc_slope(series: List[float], window: int = 10) -> float:
-        data = series[-window:]
+    def _calc_slope(series, window: int = 10) -> float:
+        data = _tail(series, window)
         n = len(data)
         if n < 2:
             return 0.0
@@ -283,12 +333,17 @@ class OptionDataStore:
     def __init__(self) -> None:
         self.ce_candles: deque[PremiumCandle] = deque(maxlen=self.MAX_BARS)
         self.pe_candles: deque[PremiumCandle] = deque(maxlen=self.MAX_BARS)
+        # Bumped on every add so premium_atr can reuse its last result per side
+        self._version = {"CE": 0, "PE": 0}
+        self._atr_cache: dict = {}
 
     def add_ce_candle(self, c: PremiumCandle) -> None:
         self.ce_candles.append(c)
+        self._version["CE"] += 1
 
     def add_pe_candle(self, c: PremiumCandle) -> None:
         self.pe_candles.append(c)
+        self._version["PE"] += 1
 
     @property
     def ce_spread(self) -> float:
@@ -314,13 +369,25 @@ class OptionDataStore:
 
     def premium_atr(self, side: str = "CE", period: int = 14) -> float:
         """ATR of premium candles (for premium-based trailing)."""
-        candles = list(self.ce_candles if side == "CE" else self.pe_candles)
-        return MarketDataStore._calc_atr(
-            [Candle(c.timestamp, c.open, c.high, c.low, c.close, c.volume)
-             for c in candles],
-            period=period,
-        ) if len(candles) >= 2 else 0.0
+        side = "CE" if side == "CE" else "PE"
+        version = self._version[side]
+        cached = self._atr_cache.get((side, period))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        candles = _tail(self.ce_candles if side == "CE" else self.pe_candles, period + 1)
+        if len(candles) < 2:
+            atr = 0.0
+        else:
+            atr = _atr_kernel(
+                [c.high for c in candles],
+                [c.low for c in candles],
+                [c.close for c in candles],
+            )
+        self._atr_cache[(side, period)] = (version, atr)
+        return atr
 
     def reset(self) -> None:
         self.ce_candles.clear()
         self.pe_candles.clear()
+        self._version["CE"] += 1
+        self._version["PE"] += 1
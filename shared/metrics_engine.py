@@ -19,10 +19,10 @@ from __future__ import annotations
 import json
 import os
 import logging
-from collections import defaultdict
+from collections import Counter, defaultdict
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 logger = logging.getLogger("metrics_engine")
 
@@ -106,7 +106,12 @@ class MetricsEngine:
     def __init__(self, data_dir: str = "/app/data"):
         self.data_dir = data_dir
         self._trades: List[TradeMetrics] = []
-        self._filtered_reasons: Dict[str, int] = defaultdict(int)
+        self._filtered_reasons: Counter[str] = Counter()
+        # Bumped on every mutation; reports/KPIs are reused while it is unchanged
+        self._epoch = 0
+        self._kpi_cache: Optional[Tuple[int, dict]] = None
+        self._report_cache: Optional[Tuple[int, str, DailyReport]] = None
+        self._saved_report: Optional[Tuple[int, str]] = None
         self._load()
 
     # ------------------------------------------------------------------
@@ -115,26 +120,50 @@ class MetricsEngine:
 
     def record_trade(self, tm: TradeMetrics) -> None:
         """Record metrics for a completed trade."""
-        # Compute capture ratio
-        if tm.mfe > 0:
-            tm.capture_ratio = round(tm.pnl / tm.mfe, 3) if tm.pnl > 0 else 0.0
-        tm.total_cost = round(tm.spread_cost + tm.slippage_cost, 2)
-        self._trades.append(tm)
+        self.record_trades((tm,))
+
+    def record_trades(self, trades: Iterable[TradeMetrics]) -> None:
+        """Record a batch of completed trades — metrics file is written once."""
+        for tm in trades:
+            # Compute capture ratio
+            if tm.mfe > 0:
+                tm.capture_ratio = round(tm.pnl / tm.mfe, 3) if tm.pnl > 0 else 0.0
+            tm.total_cost = round(tm.spread_cost + tm.slippage_cost, 2)
+            self._trades.append(tm)
+        self._epoch += 1
         self._save_metrics()
 
     def record_filtered(self, reason: str) -> None:
         """Record a signal that was filtered/skipped (for daily report)."""
         self._filtered_reasons[reason] += 1
+        self._epoch += 1
 
     # ------------------------------------------------------------------
     # Daily report
     # ------------------------------------------------------------------
 
     def generate_daily_report(self, date_str: str = "") -> DailyReport:
-        """Generate a DailyReport from today's trades."""
+        """
+        Generate a DailyReport from today's trades.
+
+        The most recent report is cached until the next record_* / reset_daily
+        call or a different date, so treat the returned object as read-only.
+        """
         if not date_str:
             date_str = datetime.now().strftime("%Y-%m-%d")
 
+        cached = self._report_cache
+        if cached is not None and cached[:2] == (self._epoch, date_str):
+            report = cached[2]
+            if report.total_trades and self._saved_report != (self._epoch, date_str):
+                self._save_report(report)
+                self._saved_report = (self._epoch, date_str)
+            return report
+        report = self._build_daily_report(date_str)
+        self._report_cache = (self._epoch, date_str, report)
+        return report
+
+    def _build_daily_report(self, date_str: str) -> DailyReport:
         day_trades = [t for t in self._trades if t.entry_time.startswith(date_str)]
 
         report = DailyReport(date=date_str)
@@ -143,64 +172,75 @@ class MetricsEngine:
             report.filtered_reasons = dict(self._filtered_reasons)
             return report
 
-        winners = [t for t in day_trades if t.pnl > 0]
-        losers = [t for t in day_trades if t.pnl <= 0]
-        report.wins = len(winners)
-        report.losses = len(losers)
-        report.win_rate = round(len(winners) / len(day_trades) * 100, 1)
-        report.total_pnl = round(sum(t.pnl for t in day_trades), 2)
-        report.expectancy = round(report.total_pnl / len(day_trades), 2)
-
-        sum_wins = sum(t.pnl for t in winners) if winners else 0
-        sum_losses = abs(sum(t.pnl for t in losers)) if losers else 0
-        report.profit_factor = round(sum_wins / sum_losses, 2) if sum_losses > 0 else float("inf")
-
-        report.avg_win = round(sum_wins / len(winners), 2) if winners else 0
-        report.avg_loss = round(-sum_losses / len(losers), 2) if losers else 0
+        # One pass over the day's trades; every aggregate below is read from it
+        n = len(day_trades)
+        n_win = 0
+        sum_wins = 0
+        sum_loss = 0
+        total_pnl = 0
+        sum_mfe = 0
+        sum_mae = 0
+        sum_cap = 0
+        n_cap = 0
+        total_costs = 0
+        regime_groups: Dict[str, list] = {}
+        profile_groups: Dict[str, list] = {}
+        hour_pnl: Dict[str, float] = defaultdict(float)
+        for t in day_trades:
+            pnl = t.pnl
+            win = pnl > 0
+            total_pnl += pnl
+            if win:
+                n_win += 1
+                sum_wins += pnl
+            else:
+                sum_loss += pnl
+            sum_mfe += t.mfe
+            sum_mae += t.mae
+            if t.capture_ratio > 0:
+                sum_cap += t.capture_ratio
+                n_cap += 1
+            total_costs += t.total_cost
+            # [trades, wins, pnl]
+            for groups, key in ((regime_groups, t.regime), (profile_groups, t.profile_id)):
+                g = groups.get(key or "UNKNOWN")
+                if g is None:
+                    g = groups[key or "UNKNOWN"] = [0, 0, 0]
+                g[0] += 1
+                g[1] += win
+                g[2] += pnl
+            if t.entry_time:
+                hour_pnl[t.entry_time[11:13]] += pnl  # "HH"
 
-        report.avg_mfe = round(sum(t.mfe for t in day_trades) / len(day_trades), 2)
-        report.avg_mae = round(sum(t.mae for t in day_trades) / len(day_trades), 2)
+        n_loss = n - n_win
+        report.wins = n_win
+        report.losses = n_loss
+        report.win_rate = round(n_win / n * 100, 1)
+        report.total_pnl = round(total_pnl, 2)
+        report.expectancy = round(report.total_pnl / n, 2)
 
-        captures = [t.capture_ratio for t in day_trades if t.capture_ratio > 0]
-        report.avg_capture_ratio = round(sum(captures) / len(captures), 3) if captures else 0
+        sum_losses = abs(sum_loss)
+        report.profit_factor = round(sum_wins / sum_losses, 2) if sum_losses > 0 else float("inf")
 
-        report.total_costs = round(sum(t.total_cost for t in day_trades), 2)
+        report.avg_win = round(sum_wins / n_win, 2) if n_win else 0
+        report.avg_loss = round(-sum_losses / n_loss, 2) if n_loss else 0
 
-        # ── By regime ──
-        regime_groups: Dict[str, List[TradeMetrics]] = defaultdict(list)
-        for t in day_trades:
-            regime_groups[t.regime or "UNKNOWN"].append(t)
-        for regime, trades in regime_groups.items():
-            w = [t for t in trades if t.pnl > 0]
-            report.by_regime[regime] = {
-                "trades": len(trades),
-                "wins": len(w),
-                "win_rate": round(len(w) / len(trades) * 100, 1),
-                "pnl": round(sum(t.pnl for t in trades), 2),
-            }
+        report.avg_mfe = round(sum_mfe / n, 2)
+        report.avg_mae = round(sum_mae / n, 2)
+        report.avg_capture_ratio = round(sum_cap / n_cap, 3) if n_cap else 0
+        report.total_costs = round(total_costs, 2)
 
-        # ── By profile ──
-        profile_groups: Dict[str, List[TradeMetrics]] = defaultdict(list)
-        for t in day_trades:
-            profile_groups[t.profile_id or "UNKNOWN"].append(t)
-        for pid, trades in profile_groups.items():
-            w = [t for t in trades if t.pnl > 0]
-            report.by_profile[pid] = {
-                "trades": len(trades),
-                "wins": len(w),
-                "win_rate": round(len(w) / len(trades) * 100, 1),
-                "pnl": round(sum(t.pnl for t in trades), 2),
-            }
+        # ── By regime / profile ──
+        for target, groups in ((report.by_regime, regime_groups), (report.by_profile, profile_groups)):
+            for key, (count, wins, pnl) in groups.items():
+                target[key] = {
+                    "trades": count,
+                    "wins": wins,
+                    "win_rate": round(wins / count * 100, 1),
+                    "pnl": round(pnl, 2),
+                }
 
         # ── Best / worst time windows ──
-        hour_pnl: Dict[str, float] = defaultdict(float)
-        for t in day_trades:
-            if t.entry_time:
-                try:
-                    hour = t.entry_time[11:13]  # "HH"
-                    hour_pnl[hour] += t.pnl
-                except (IndexError, ValueError):
-                    pass
         if hour_pnl:
             report.best_window = max(hour_pnl, key=hour_pnl.get)
             report.worst_window = min(hour_pnl, key=hour_pnl.get)
@@ -209,6 +249,7 @@ class MetricsEngine:
 
         # Save report
         self._save_report(report)
+        self._saved_report = (self._epoch, date_str)
         return report
 
     # ------------------------------------------------------------------
@@ -239,31 +280,49 @@ class MetricsEngine:
     def compute_kpis(self, trades: Optional[List[TradeMetrics]] = None) -> dict:
         """
         Compute momentum KPIs used by SelfLearningEngine.
+
+        The default (last 50 trades) result is cached until the next trade;
+        callers get their own copy of the dict.
         """
         if trades is None:
-            trades = self._trades[-50:]  # last 50
+            if self._kpi_cache is None or self._kpi_cache[0] != self._epoch:
+                self._kpi_cache = (self._epoch, self.compute_kpis(self._trades[-50:]))  # last 50
+            return dict(self._kpi_cache[1])
 
         if not trades:
             return {"profit_factor": 0, "expectancy": 0, "win_rate": 0,
                     "avg_win_loss_ratio": 0, "avg_capture_ratio": 0}
 
-        winners = [t for t in trades if t.pnl > 0]
-        losers = [t for t in trades if t.pnl <= 0]
         total = len(trades)
-
-        sum_w = sum(t.pnl for t in winners)
-        sum_l = abs(sum(t.pnl for t in losers))
+        n_win = 0
+        sum_w = 0
+        sum_l = 0
+        sum_all = 0
+        sum_cap = 0
+        n_cap = 0
+        for t in trades:
+            pnl = t.pnl
+            sum_all += pnl
+            if pnl > 0:
+                n_win += 1
+                sum_w += pnl
+            else:
+                sum_l += pnl
+            if t.capture_ratio > 0:
+                sum_cap += t.capture_ratio
+                n_cap += 1
+        n_loss = total - n_win
+        sum_l = abs(sum_l)
 
         pf = sum_w / sum_l if sum_l > 0 else float("inf")
-        expectancy = sum(t.pnl for t in trades) / total
-        win_rate = len(winners) / total * 100
+        expectancy = sum_all / total
+        win_rate = n_win / total * 100
 
-        avg_win = sum_w / len(winners) if winners else 0
-        avg_loss = sum_l / len(losers) if losers else 1
+        avg_win = sum_w / n_win if n_win else 0
+        avg_loss = sum_l / n_loss if n_loss else 1
         wl_ratio = avg_win / avg_loss if avg_loss > 0 else float("inf")
 
-        captures = [t.capture_ratio for t in trades if t.capture_ratio > 0]
-        avg_cap = sum(captures) / len(captures) if captures else 0
+        avg_cap = sum_cap / n_cap if n_cap else 0
 
         return {
             "profit_factor": round(pf, 3),
@@ -293,7 +352,7 @@ class MetricsEngine:
                     k: v for k, v in item.items()
                     if k in TradeMetrics.__dataclass_fields__
                 }))
-            self._filtered_reasons = defaultdict(int, data.get("filtered_reasons", {}))
+            self._filtered_reasons = Counter(data.get("filtered_reasons", {}))
             # Only keep last 500 trades in memory
             if len(self._trades) > 500:
                 self._trades = self._trades[-500:]
@@ -325,3 +384,4 @@ class MetricsEngine:
     def reset_daily(self) -> None:
         """Reset filtered reasons for a new day. Keep trade history."""
         self._filtered_reasons.clear()
+        self._epoch += 1
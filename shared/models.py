@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 
@@ -27,7 +28,9 @@ class RecommendationBase(BaseModel):
 class Recommendation(RecommendationBase):
     id: str
 
-class Signal(BaseModel):
+@dataclass(slots=True)
+class Signal:
+    """Internal scored-signal record (never an API body, so no validation layer)."""
     source: str
     content: str
     sentiment: float
@@ -35,7 +38,7 @@ class Signal(BaseModel):
     confidence: float = 1.0
     freshness: float = 1.0
     metadata: Optional[Dict[str, Any]] = None
-    timestamp: datetime = datetime.now()
+    timestamp: datetime = field(default_factory=datetime.now)
 
 # EPIC 1: User & Auth Models
 class RiskTolerance(str, Enum):
@@ -25,7 +25,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import List
+from typing import List, Optional
 
 from shared.market_data_store import Candle, DerivedIndicators
 
@@ -62,7 +62,7 @@ class MomentumSignal:
 
 
 # ── Default thresholds (can be overridden per-profile) ──
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MomentumConfig:
     # Breakout
     breakout_buffer_pct: float = 0.0   # 0% buffer above ORH/H15
@@ -81,6 +81,9 @@ class MomentumConfig:
     default_entry_mode: EntryMode = EntryMode.BREAKOUT_CONFIRM
 
 
+DEFAULT_MOMENTUM_CONFIG = MomentumConfig()
+
+
 class MomentumSignalEngine:
     """
     Stateful engine — tracks breakout-confirmation candle count
@@ -105,7 +108,7 @@ class MomentumSignalEngine:
         self,
         ind: DerivedIndicators,
         candles: List[Candle],
-        config: MomentumConfig = MomentumConfig(),
+        config: Optional[MomentumConfig] = None,
         volume_avg: float = 1.0,
         oi_change_call_pct: float = 0.0,
         oi_change_put_pct: float = 0.0,
@@ -113,6 +116,8 @@ class MomentumSignalEngine:
         is_option: bool = True,
     ) -> MomentumSignal:
         """Evaluate momentum conditions and return a signal."""
+        if config is None:
+            config = DEFAULT_MOMENTUM_CONFIG
         sig = MomentumSignal(direction=SignalDirection.NONE)
 
         if ind.spot <= 0 or ind.atr_14 <= 0:
@@ -157,9 +162,11 @@ class MomentumSignalEngine:
         sig.reasons.append(f"Breakout dist {bo_distance_pct:.2f}% → score {sig.breakout_score:.1f}")
 
         # ── Expansion score (0–25) ──
+        # Only the last three bars are ever read — unpack them, no per-call scans
+        last = candles[-1] if candles else None
         if len(candles) >= 3:
-            last3 = candles[-3:]
-            range_3 = max(c.high for c in last3) - min(c.low for c in last3)
+            c1, c2, c3 = candles[-3], candles[-2], last
+            range_3 = max(c1.high, c2.high, c3.high) - min(c1.low, c2.low, c3.low)
         else:
             range_3 = 0.0
         expansion_ratio = range_3 / atr if atr > 0 else 0
@@ -172,7 +179,7 @@ class MomentumSignalEngine:
             return sig
 
         # ── Participation score (0–20) ──
-        latest_vol = candles[-1].volume if candles else 0
+        latest_vol = last.volume if last is not None else 0
         vol_spike = latest_vol / volume_avg if volume_avg > 0 else 0
         if vol_spike >= config.vol_spike_min:
             vol_part = min(10.0, (vol_spike - 1.0) * 10)
@@ -223,10 +230,9 @@ class MomentumSignalEngine:
         vwap_dist_score = min(8.0, (abs(spot - ind.vwap) / atr) * 4)
         # Wick noise: ratio of wicks to body in last candle
         wick_score = 7.0  # default; reduce if wicks are large
-        if candles:
-            c = candles[-1]
-            body = abs(c.close - c.open)
-            full_range = c.high - c.low
+        if last is not None:
+            body = abs(last.close - last.open)
+            full_range = last.high - last.low
             if full_range > 0:
                 wick_ratio = 1 - (body / full_range)
                 wick_score = max(0, 7.0 * (1 - wick_ratio))
@@ -19,6 +19,9 @@ from __future__ import annotations
 
 import math
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import repeat
+from typing import Iterable, List, Optional, Tuple
 
 
 @dataclass
@@ -41,6 +44,103 @@ class SpreadModel:
     max_spread_pct: float = 2.0       # cap
 
 
+# ──────────────────────────────────────────────────────────────────
+# Black-Scholes core (pure functions of the contract inputs)
+# ──────────────────────────────────────────────────────────────────
+
+_INV_SQRT2 = 1.0 / math.sqrt(2.0)
+_INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+_erf = math.erf
+_exp = math.exp
+
+
+def _norm_cdf(x: float) -> float:
+    """Cumulative distribution function for standard normal (no scipy dependency)."""
+    return 0.5 * (1.0 + _erf(x * _INV_SQRT2))
+
+
+def _norm_pdf(x: float) -> float:
+    """Probability density function for standard normal."""
+    return _INV_SQRT_2PI * _exp(-0.5 * x * x)
+
+
+def _bs_greeks(
+    s: float, k: float, dte: float, iv: float, r: float, is_call: bool,
+) -> Tuple[float, float, float, float, float]:
+    """(delta, gamma, theta/day, vega/1% IV, iv) — simplified Black-Scholes greeks."""
+    t = dte / 365.0
+    sigma = iv / 100.0
+
+    if t <= 0 or sigma <= 0:
+        # At or past expiry
+        intrinsic = max(0, s - k) if is_call else max(0, k - s)
+        return (1.0 if intrinsic > 0 else 0.0, 0.0, 0.0, 0.0, iv)
+
+    sqrt_t = math.sqrt(t)
+    d1 = (math.log(s / k) + (r + 0.5 * sigma ** 2) * t) / (sigma * sqrt_t)
+    d2 = d1 - sigma * sqrt_t
+
+    # ── Delta ──
+    nd1 = _norm_cdf(d1)
+    delta = nd1 if is_call else nd1 - 1.0
+
+    # ── Gamma ── (same for call/put)
+    nprime_d1 = _norm_pdf(d1)
+    gamma = nprime_d1 / (s * sigma * sqrt_t) if s > 0 else 0.0
+
+    # ── Theta ── (per day, in premium terms, with risk-free rate)
+    theta_annual = -(s * nprime_d1 * sigma) / (2 * sqrt_t)
+    if is_call:
+        theta_annual -= r * k * math.exp(-r * t) * _norm_cdf(d2)
+    else:
+        theta_annual += r * k * math.exp(-r * t) * _norm_cdf(-d2)
+    theta_daily = theta_annual / 365.0
+
+    # ── Vega ── (per 1% IV change)
+    vega = s * nprime_d1 * sqrt_t / 100.0  # per 1% IV
+
+    return (
+        round(delta, 4),
+        round(gamma, 6),
+        round(theta_daily, 2),
+        round(vega, 2),
+        round(iv, 2),
+    )
+
+
+def _bs_premium(s: float, k: float, dte: float, iv: float, r: float, is_call: bool) -> float:
+    """Black-Scholes price with risk-free rate (GAP-7)."""
+    t = dte / 365.0
+    sigma = iv / 100.0
+
+    if t <= 0 or sigma <= 0:
+        return max(0, s - k) if is_call else max(0, k - s)
+
+    sqrt_t = math.sqrt(t)
+    d1 = (math.log(s / k) + (r + 0.5 * sigma ** 2) * t) / (sigma * sqrt_t)
+    d2 = d1 - sigma * sqrt_t
+
+    if is_call:
+        price = s * _norm_cdf(d1) - k * math.exp(-r * t) * _norm_cdf(d2)
+    else:
+        price = k * math.exp(-r * t) * _norm_cdf(-d2) - s * _norm_cdf(-d1)
+
+    return max(0.05, round(price, 2))
+
+
+@lru_cache(maxsize=256)
+def _bs_initial(
+    s: float, k: float, dte: float, iv: float, r: float, is_call: bool,
+) -> Tuple[Tuple[float, float, float, float, float], float]:
+    """
+    Opening (greeks, premium) for a contract.  The key includes the live spot,
+    so the scalping loop rarely hits the cache — it only pays off for repeated
+    identical constructions (tests, replays).  Kept small so live calls don't
+    churn a large table; tick() always goes through the uncached functions above.
+    """
+    return _bs_greeks(s, k, dte, iv, r, is_call), _bs_premium(s, k, dte, iv, r, is_call)
+
+
 class PremiumSimulator:
     """
     Simulates option premium dynamics for paper trading.
@@ -74,9 +174,11 @@ class PremiumSimulator:
         self.lot_size = lot_size
         self.r = risk_free_rate if risk_free_rate is not None else self.RISK_FREE_RATE
 
-        # Initialise greeks
-        self._greeks = self._compute_greeks()
-        self.premium = self._bs_price()
+        # Initialise greeks — identical constructions are priced once (see _bs_initial)
+        greeks, self.premium = _bs_initial(
+            spot, strike, self.dte, iv, self.r, self.option_type == "CE",
+        )
+        self._greeks = GreeksSnapshot(*greeks)
         self._spread_model = SpreadModel()
 
     # ------------------------------------------------------------------
@@ -134,82 +236,41 @@ class PremiumSimulator:
         self.premium = max(0.05, round(new_premium, 2))
         return self.premium
 
+    def tick_batch(
+        self,
+        spots: Iterable[float],
+        elapsed_seconds: float = 1.0,
+        is_breakout: Optional[Iterable[bool]] = None,
+        is_chop: Optional[Iterable[bool]] = None,
+    ) -> List[float]:
+        """
+        Advance through a spot path, one tick per spot.  Returns the premiums.
+
+        *is_breakout* / *is_chop* are per-tick flags aligned with *spots*
+        (all False when omitted).
+        """
+        tick = self.tick
+        breakouts = repeat(False) if is_breakout is None else is_breakout
+        chops = repeat(False) if is_chop is None else is_chop
+        return [
+            tick(spot, elapsed_seconds, is_breakout=b, is_chop=c)
+            for spot, b, c in zip(spots, breakouts, chops)
+        ]
+
     # ------------------------------------------------------------------
     # Greeks computation (simplified Black-Scholes-like)
     # ------------------------------------------------------------------
 
     def _compute_greeks(self) -> GreeksSnapshot:
-        s = self.spot
-        k = self.strike
-        t = self.dte / 365.0
-        sigma = self.iv / 100.0
-        r = self.r  # GAP-7: risk-free rate
-        is_call = self.option_type == "CE"
-
-        if t <= 0 or sigma <= 0:
-            # At or past expiry
-            intrinsic = max(0, s - k) if is_call else max(0, k - s)
-            return GreeksSnapshot(
-                delta=1.0 if intrinsic > 0 else 0.0,
-                gamma=0.0,
-                theta=0.0,
-                vega=0.0,
-                iv=self.iv,
-            )
-
-        sqrt_t = math.sqrt(t)
-        d1 = (math.log(s / k) + (r + 0.5 * sigma ** 2) * t) / (sigma * sqrt_t)
-        d2 = d1 - sigma * sqrt_t
-
-        # ── Delta ──
-        nd1 = self._norm_cdf(d1)
-        delta = nd1 if is_call else nd1 - 1.0
-
-        # ── Gamma ── (same for call/put)
-        nprime_d1 = self._norm_pdf(d1)
-        gamma = nprime_d1 / (s * sigma * sqrt_t) if s > 0 else 0.0
-
-        # ── Theta ── (per day, in premium terms, with risk-free rate)
-        theta_annual = -(s * nprime_d1 * sigma) / (2 * sqrt_t)
-        if is_call:
-            theta_annual -= r * k * math.exp(-r * t) * self._norm_cdf(d2)
-        else:
-            theta_annual += r * k * math.exp(-r * t) * self._norm_cdf(-d2)
-        theta_daily = theta_annual / 365.0
-
-        # ── Vega ── (per 1% IV change)
-        vega = s * nprime_d1 * sqrt_t / 100.0  # per 1% IV
-
-        return GreeksSnapshot(
-            delta=round(delta, 4),
-            gamma=round(gamma, 6),
-            theta=round(theta_daily, 2),
-            vega=round(vega, 2),
-            iv=round(self.iv, 2),
-        )
+        return GreeksSnapshot(*_bs_greeks(
+            self.spot, self.strike, self.dte, self.iv, self.r, self.option_type == "CE",
+        ))
 
     def _bs_price(self) -> float:
         """Black-Scholes price with risk-free rate (GAP-7)."""
-        s = self.spot
-        k = self.strike
-        t = self.dte / 365.0
-        sigma = self.iv / 100.0
-        r = self.r
-        is_call = self.option_type == "CE"
-
-        if t <= 0 or sigma <= 0:
-            return max(0, s - k) if is_call else max(0, k - s)
-
-        sqrt_t = math.sqrt(t)
-        d1 = (math.log(s / k) + (r + 0.5 * sigma ** 2) * t) / (sigma * sqrt_t)
-        d2 = d1 - sigma * sqrt_t
-
-        if is_call:
-            price = s * self._norm_cdf(d1) - k * math.exp(-r * t) * self._norm_cdf(d2)
-        else:
-            price = k * math.exp(-r * t) * self._norm_cdf(-d2) - s * self._norm_cdf(-d1)
-
-        return max(0.05, round(price, 2))
+        return _bs_premium(
+            self.spot, self.strike, self.dte, self.iv, self.r, self.option_type == "CE",
+        )
 
     # ------------------------------------------------------------------
     # Spread model
@@ -244,20 +305,6 @@ class PremiumSimulator:
     def greeks(self) -> GreeksSnapshot:
         return self._greeks
 
-    # ------------------------------------------------------------------
-    # Normal distribution helpers (no scipy dependency)
-    # ------------------------------------------------------------------
-
-    @staticmethod
-    def _norm_cdf(x: float) -> float:
-        """Cumulative distribution function for standard normal."""
-        return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
-
-    @staticmethod
-    def _norm_pdf(x: float) -> float:
-        """Probability density function for standard normal."""
-        return math.exp(-0.5 * x * x) / math.sqrt(2.0 * math.pi)
-
     # ------------------------------------------------------------------
     # Serialisation
     # ------------------------------------------------------------------
@@ -61,6 +61,37 @@ _LATE_END = 15 * 60 + 15      # 15:15
 _CHOP_WINDOW_START = 11 * 60   # 11:00
 _CHOP_WINDOW_END = 13 * 60 + 15  # 13:15
 
+# ── Session buckets ──
+_SESSION_OPEN = 0
+_SESSION_MID = 1    # also covers minutes outside 9:15–15:15
+_SESSION_LATE = 2
+
+# ── Regime by (session, is_chop, is_trend) — is_trend is ignored when chop ──
+_REGIME_TABLE = {
+    (_SESSION_OPEN, True, False): Regime.OPEN_CHOP,
+    (_SESSION_OPEN, True, True): Regime.OPEN_CHOP,
+    (_SESSION_OPEN, False, True): Regime.OPEN_TREND,
+    (_SESSION_OPEN, False, False): Regime.OPEN_CHOP,
+    (_SESSION_MID, True, False): Regime.MID_CHOP,
+    (_SESSION_MID, True, True): Regime.MID_CHOP,
+    (_SESSION_MID, False, True): Regime.MID_TREND,
+    (_SESSION_MID, False, False): Regime.MID_CHOP,
+    (_SESSION_LATE, True, False): Regime.MID_CHOP,   # late chop treated same
+    (_SESSION_LATE, True, True): Regime.MID_CHOP,
+    (_SESSION_LATE, False, True): Regime.LATE_TREND,
+    (_SESSION_LATE, False, False): Regime.MID_CHOP,
+}
+
+_CHOP_REGIMES = frozenset((Regime.OPEN_CHOP, Regime.MID_CHOP))
+
+
+def _session_bucket(minute_of_day: int) -> int:
+    if _OPEN_START <= minute_of_day < _OPEN_END:
+        return _SESSION_OPEN
+    if _MID_END <= minute_of_day <= _LATE_END:
+        return _SESSION_LATE
+    return _SESSION_MID
+
 
 class RegimeEngine:
     """
@@ -135,11 +166,6 @@ class RegimeEngine:
             base.no_trade_reason = f"Event spike (range {range_last_3:.1f} > {self.event_spike_atr_mult}×ATR={self.event_spike_atr_mult * atr:.1f})"
             return base
 
-        # ── Time-of-day session ──
-        is_open = _OPEN_START <= minute_of_day < _OPEN_END
-        is_mid = _OPEN_END <= minute_of_day < _MID_END
-        is_late = _MID_END <= minute_of_day <= _LATE_END
-
         # ── Chop detection ──
         is_chop = False
         chop_reason = ""
@@ -154,42 +180,26 @@ class RegimeEngine:
             is_chop = True
             chop_reason = f"Low ATR ({atr:.2f} < {self.atr_min_threshold})"
 
-        # ── Time-of-day chop window enforcement ──
-        in_chop_window = _CHOP_WINDOW_START <= minute_of_day < _CHOP_WINDOW_END
+        # ── Trend: VWAP sloping + price off the VWAP magnet ──
+        is_trend = abs(vwap_slope) > 0 and vwap_distance_atr >= self.vwap_magnet_ratio
+
+        # ── Time-of-day session → regime ──
+        base.regime = _REGIME_TABLE[(_session_bucket(minute_of_day), is_chop, is_trend)]
+        base.recommended_profile_id = _REGIME_PROFILE_MAP[base.regime]
 
         if is_chop:
-            if is_open:
-                base.regime = Regime.OPEN_CHOP
-            elif is_mid:
-                base.regime = Regime.MID_CHOP
-            else:
-                base.regime = Regime.MID_CHOP  # late chop treated same
-            base.recommended_profile_id = _REGIME_PROFILE_MAP[base.regime]
             base.is_trade_allowed = False
             base.no_trade_reason = chop_reason
             return base
 
-        # ── Trend classification ──
-        # Determine trend: VWAP slope positive + price above/below VWAP
-        is_trend = abs(vwap_slope) > 0 and vwap_distance_atr >= self.vwap_magnet_ratio
-
-        if is_open:
-            base.regime = Regime.OPEN_TREND if is_trend else Regime.OPEN_CHOP
-        elif is_late:
-            base.regime = Regime.LATE_TREND if is_trend else Regime.MID_CHOP
-        else:
-            base.regime = Regime.MID_TREND if is_trend else Regime.MID_CHOP
-
-        base.recommended_profile_id = _REGIME_PROFILE_MAP[base.regime]
-
         # ── Chop-window gate: block mid-day trades unless confidence ≥ 85 ──
-        if in_chop_window and confidence < 70:
+        if _CHOP_WINDOW_START <= minute_of_day < _CHOP_WINDOW_END and confidence < 70:
             base.is_trade_allowed = False
             base.no_trade_reason = f"Chop window (11:00-13:15) + confidence {confidence:.0f} < 70"
             return base
 
         # If classified as chop variant, block
-        if base.regime in (Regime.OPEN_CHOP, Regime.MID_CHOP):
+        if base.regime in _CHOP_REGIMES:
             base.is_trade_allowed = False
             base.no_trade_reason = "Regime is CHOP"
 
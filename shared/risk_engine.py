@@ -28,7 +28,7 @@ from __future__ import annotations
 import time
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional, Tuple
 
 
 class RiskMode(str, Enum):
@@ -80,6 +80,14 @@ class RiskConfig:
     mf_volume_collapse_ratio: float = 0.5  # volume drops to 50% of entry candle
 
 
+def _update_mfe_mae(
+    mfe: float, mae: float, entry: float, price: float, is_long: bool,
+) -> Tuple[float, float]:
+    """Fold one tick into (MFE, MAE) — both tracked as non-negative distances."""
+    excursion = price - entry if is_long else entry - price
+    return max(mfe, excursion), max(mae, -excursion)
+
+
 @dataclass
 class TradeRiskState:
     """Per-trade risk tracking state."""
@@ -262,12 +270,10 @@ class RiskEngine:
             return None
 
         # ── Update MFE / MAE ──
+        state.mfe, state.mae = _update_mfe_mae(
+            state.mfe, state.mae, state.entry_price, current_price, state.is_long,
+        )
         if state.is_long:
-            excursion = current_price - state.entry_price
-            if excursion > state.mfe:
-                state.mfe = excursion
-            if excursion < 0 and abs(excursion) > state.mae:
-                state.mae = abs(excursion)
             if current_price > state.peak_price:
                 state.peak_price = current_price
                 state.candles_since_new_high = 0
@@ -275,11 +281,6 @@ class RiskEngine:
             else:
                 state.candles_since_new_high = candle_idx - state.last_peak_candle_idx
         else:
-            excursion = state.entry_price - current_price
-            if excursion > state.mfe:
-                state.mfe = excursion
-            if excursion < 0 and abs(excursion) > state.mae:
-                state.mae = abs(excursion)
             if current_price < state.trough_price:
                 state.trough_price = current_price
                 state.candles_since_new_high = 0
@@ -324,6 +325,35 @@ class RiskEngine:
 
         return None
 
+    def update_ticks(
+        self,
+        trade_id: str,
+        prices: Iterable[float],
+        candle_idxs: Iterable[int],
+        premium_atr: float = 0.0,
+        atr: float = 0.0,
+        volume_ratio: float = 1.0,
+        spot_in_breakout_zone: bool = False,
+        vwap_recrossed: bool = False,
+        is_late_session: bool = False,
+        is_option: bool = True,
+    ) -> Optional[ExitReason]:
+        """
+        Replay a batch of ticks (e.g. a candle backlog) through update_tick.
+        Stops at — and returns — the first ExitReason, else None.
+        """
+        if trade_id not in self._trade_states:
+            return None
+        update = self.update_tick
+        for price, idx in zip(prices, candle_idxs):
+            reason = update(
+                trade_id, price, premium_atr, atr, idx, volume_ratio,
+                spot_in_breakout_zone, vwap_recrossed, is_late_session, is_option,
+            )
+            if reason is not None:
+                return reason
+        return None
+
     def _compute_runner_trail(
         self,
         state: TradeRiskState,
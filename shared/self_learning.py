@@ -29,7 +29,7 @@ import math
 import os
 import logging
 from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 logger = logging.getLogger("self_learning")
 
@@ -148,7 +148,8 @@ class SelfLearningEngine:
     LEARNING_FILE_NAME = "momentum_learning.json"
     UPDATE_CADENCE = 25   # update bandit every N trades
 
-    def __init__(self, data_dir: str = "/app/data"):
+    def __init__(self, data_dir: Optional[str] = "/app/data"):
+        # data_dir=None keeps all state in memory (no load / save)
         self.data_dir = data_dir
         self._profiles: Dict[str, ProfileParams] = {
             k: ProfileParams(**asdict(v)) for k, v in DEFAULT_PROFILES.items()
@@ -236,6 +237,14 @@ class SelfLearningEngine:
         if len(self._trade_buffer) >= self.UPDATE_CADENCE:
             self._bandit_update()
 
+    def record_trade_results(
+        self, results: Iterable[Tuple[str, float, float, str]],
+    ) -> None:
+        """Record a batch of (profile_id, pnl, drawdown, regime) results in order."""
+        record = self.record_trade_result
+        for profile_id, pnl, drawdown, regime in results:
+            record(profile_id, pnl, drawdown, regime)
+
     # ------------------------------------------------------------------
     # EOD / periodic update
     # ------------------------------------------------------------------
@@ -303,6 +312,8 @@ class SelfLearningEngine:
         return os.path.join(self.data_dir, self.LEARNING_FILE_NAME)
 
     def _load(self) -> None:
+        if self.data_dir is None:
+            return
         fp = self._filepath()
         if not os.path.exists(fp):
             return
@@ -331,6 +342,8 @@ class SelfLearningEngine:
             logger.error(f"Failed to load learning: {e}")
 
     def _save(self) -> None:
+        if self.data_dir is None:
+            return
         try:
             os.makedirs(self.data_dir, exist_ok=True)
             data = {
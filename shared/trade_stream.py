@@ -14,14 +14,30 @@ so the system still works without Kafka infrastructure.
 """
 
 import asyncio
-import json
 import logging
 import os
+import sys
 import uuid
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Callable, Dict, List, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from zoneinfo import ZoneInfo
 
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+    _loads = orjson.loads
+except ImportError:  # stdlib fallback — same payloads, just slower
+    import json
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, default=str, separators=(",", ":")).encode()
+
+    _loads = json.loads
+
 logger = logging.getLogger("trade_stream")
 IST = ZoneInfo("Asia/Kolkata")
 
@@ -29,57 +45,53 @@ IST = ZoneInfo("Asia/Kolkata")
 KAFKA_BOOTSTRAP = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "")
 KAFKA_ENABLED = bool(KAFKA_BOOTSTRAP)
 
-# Topics
-TOPIC_TRADE_REQUEST = "signalforge.trades.request"
-TOPIC_TRADE_STATUS = "signalforge.trades.status"
-TOPIC_TRAILING_SL = "signalforge.trades.trailing_sl"
+# Topics — dotted names aren't auto-interned by the compiler; interning them
+# means any sys.intern'd rebuild of a name is the same object as the queue key
+TOPIC_TRADE_REQUEST = sys.intern("signalforge.trades.request")
+TOPIC_TRADE_STATUS = sys.intern("signalforge.trades.status")
+TOPIC_TRAILING_SL = sys.intern("signalforge.trades.trailing_sl")
 
 
 # ──────────────────────────────────────────────────────────────────
 # Trade Message Schema
 # ──────────────────────────────────────────────────────────────────
+def _new_message_id() -> str:
+    return str(uuid.uuid4())
+
+
+def _now_ist_iso() -> str:
+    return datetime.now(IST).isoformat()
+
+
+@dataclass(slots=True)
 class TradeMessage:
-    """Standardized trade message for Kafka streaming."""
-
-    def __init__(
-        self,
-        user_id: str,
-        user_email: str,
-        action: str,          # "PLACE", "CLOSE", "MODIFY_SL", "SQUARE_OFF"
-        symbol: str,
-        trade_type: str = "BUY",
-        quantity: int = 0,
-        price: float = 0.0,
-        target: float = 0.0,
-        stop_loss: float = 0.0,
-        lots: int = 0,
-        order_mode: str = "intraday",     # "intraday", "options"
-        source: str = "AI",              # "AI" or "MANUAL"
-        broker_config: dict = None,
-        trade_id: str = "",
-        iceberg: bool = False,
-        conviction: float = 0.0,
-        metadata: dict = None,
-    ):
-        self.message_id = str(uuid.uuid4())
-        self.timestamp = datetime.now(IST).isoformat()
-        self.user_id = user_id
-        self.user_email = user_email
-        self.action = action
-        self.symbol = symbol
-        self.trade_type = trade_type
-        self.quantity = quantity
-        self.price = price
-        self.target = target
-        self.stop_loss = stop_loss
-        self.lots = lots
-        self.order_mode = order_mode
-        self.source = source
-        self.broker_config = broker_config or {}
-        self.trade_id = trade_id
-        self.iceberg = iceberg
-        self.conviction = conviction
-        self.metadata = metadata or {}
+    """Standardized trade message for Kafka streaming (slotted: one per signal / hop)."""
+
+    user_id: str
+    user_email: str
+    action: str          # "PLACE", "CLOSE", "MODIFY_SL", "SQUARE_OFF"
+    symbol: str
+    trade_type: str = "BUY"
+    quantity: int = 0
+    price: float = 0.0
+    target: float = 0.0
+    stop_loss: float = 0.0
+    lots: int = 0
+    order_mode: str = "intraday"     # "intraday", "options"
+    source: str = "AI"              # "AI" or "MANUAL"
+    broker_config: Optional[dict] = None
+    trade_id: str = ""
+    iceberg: bool = False
+    conviction: float = 0.0
+    metadata: Optional[dict] = None
+    message_id: str = field(default_factory=_new_message_id)
+    timestamp: str = field(default_factory=_now_ist_iso)
+
+    def __post_init__(self):
+        if not self.broker_config:
+            self.broker_config = {}
+        if not self.metadata:
+            self.metadata = {}
 
     def to_dict(self) -> dict:
         return {
@@ -105,11 +117,13 @@ class TradeMessage:
         }
 
     def to_json(self) -> str:
-        return json.dumps(self.to_dict(), default=str)
+        return _dumps(self.to_dict()).decode()
 
     @classmethod
     def from_dict(cls, d: dict) -> "TradeMessage":
-        msg = cls(
+        # Keep the wire message_id / timestamp; mint new ones only if absent
+        ids = {k: d[k] for k in ("message_id", "timestamp") if k in d}
+        return cls(
             user_id=d.get("user_id", ""),
             user_email=d.get("user_email", ""),
             action=d.get("action", ""),
@@ -127,81 +141,102 @@ class TradeMessage:
             iceberg=d.get("iceberg", False),
             conviction=d.get("conviction", 0.0),
             metadata=d.get("metadata", {}),
+            **ids,
         )
-        msg.message_id = d.get("message_id", msg.message_id)
-        msg.timestamp = d.get("timestamp", msg.timestamp)
-        return msg
 
 
 # ──────────────────────────────────────────────────────────────────
 # In-Memory Queue (Fallback when Kafka isn't available)
 # ──────────────────────────────────────────────────────────────────
 class InMemoryTradeStream:
-    """Async in-memory trade message queue. Fallback when Kafka is not configured."""
+    """
+    Async in-memory trade message queue. Fallback when Kafka is not configured.
+
+    Every subscriber gets its own queue and consumer task, so publish fans a
+    message out and a slow handler never holds up the others on its topic.
+    """
+
+    QUEUE_MAXSIZE = 10000
 
     def __init__(self):
-        self._queues: Dict[str, asyncio.Queue] = {}
-        self._handlers: Dict[str, List[Callable]] = {}
+        # topic -> one queue per subscriber (parallel to _handlers[topic]).
+        # Tuples are replaced, never mutated, so publish iterates a stable snapshot.
+        self._queues: Dict[str, Tuple[asyncio.Queue, ...]] = {}
+        self._handlers: Dict[str, Tuple[Callable, ...]] = {}
         self._running = False
         self._consumer_tasks: List[asyncio.Task] = []
 
-    def _get_queue(self, topic: str) -> asyncio.Queue:
-        if topic not in self._queues:
-            self._queues[topic] = asyncio.Queue(maxsize=10000)
-        return self._queues[topic]
-
     async def publish(self, topic: str, message: TradeMessage):
-        """Publish a trade message to a topic."""
-        queue = self._get_queue(topic)
-        try:
-            queue.put_nowait(message.to_dict())
-            logger.debug(f"Published to {topic}: {message.message_id}")
-        except asyncio.QueueFull:
-            logger.warning(f"Queue full for {topic}, dropping message")
+        """Publish a trade message to every subscriber of a topic."""
+        msg_dict = message.to_dict()
+        for queue in self._queues.get(topic, ()):
+            try:
+                queue.put_nowait(msg_dict)
+            except asyncio.QueueFull:
+                logger.warning(f"Queue full for {topic}, dropping message")
+        logger.debug(f"Published to {topic}: {message.message_id}")
 
     def subscribe(self, topic: str, handler: Callable):
         """Register a handler for messages on a topic."""
-        if topic not in self._handlers:
-            self._handlers[topic] = []
-        self._handlers[topic].append(handler)
+        queue = asyncio.Queue(maxsize=self.QUEUE_MAXSIZE)
+        self._handlers[topic] = self._handlers.get(topic, ()) + (handler,)
+        self._queues[topic] = self._queues.get(topic, ()) + (queue,)
+        if self._running:
+            # Late subscription — start its consumer right away
+            self._start_consumer(topic, handler, queue)
         logger.info(f"Subscribed handler to {topic}")
 
-    async def _consume(self, topic: str):
-        """Consume messages from a topic and dispatch to handlers."""
-        queue = self._get_queue(topic)
-        handlers = self._handlers.get(topic, [])
-
+    async def clear_subscribers(self):
+        """Drop all handlers, their consumers and pending messages. The stream stays running."""
+        for task in self._consumer_tasks:
+            task.cancel()
+        await asyncio.gather(*self._consumer_tasks, return_exceptions=True)
+        self._consumer_tasks.clear()
+        self._handlers.clear()
+        self._queues.clear()
+
+    async def drain(self):
+        """Wait until every message published so far has been handled."""
+        if not self._running:
+            return
+        await asyncio.gather(*(
+            queue.join() for queues in self._queues.values() for queue in queues
+        ))
+
+    def _start_consumer(self, topic: str, handler: Callable, queue: asyncio.Queue):
+        task = asyncio.create_task(self._consume(topic, handler, queue))
+        self._consumer_tasks.append(task)
+
+    async def _consume(self, topic: str, handler: Callable, queue: asyncio.Queue):
+        """Consume one subscriber's queue and dispatch to its handler."""
+        is_async = asyncio.iscoroutinefunction(handler)
         while self._running:
+            msg_dict = await queue.get()
             try:
-                msg_dict = await asyncio.wait_for(queue.get(), timeout=1.0)
                 message = TradeMessage.from_dict(msg_dict)
-                for handler in handlers:
-                    try:
-                        if asyncio.iscoroutinefunction(handler):
-                            await handler(message)
-                        else:
-                            handler(message)
-                    except Exception as e:
-                        logger.error(f"Handler error on {topic}: {e}")
-            except asyncio.TimeoutError:
-                continue
+                if is_async:
+                    await handler(message)
+                else:
+                    handler(message)
             except Exception as e:
-                logger.error(f"Consumer error on {topic}: {e}")
-                await asyncio.sleep(1)
+                logger.error(f"Handler error on {topic}: {e}")
+            finally:
+                queue.task_done()
 
     async def start(self):
-        """Start consuming all subscribed topics."""
+        """Start one consumer per subscriber."""
         self._running = True
-        for topic in self._handlers:
-            task = asyncio.create_task(self._consume(topic))
-            self._consumer_tasks.append(task)
+        for topic, handlers in self._handlers.items():
+            for handler, queue in zip(handlers, self._queues[topic]):
+                self._start_consumer(topic, handler, queue)
         logger.info(f"InMemoryTradeStream started with {len(self._consumer_tasks)} consumers")
 
     async def stop(self):
-        """Stop all consumers."""
+        """Stop all consumers and wait for them to exit."""
         self._running = False
         for task in self._consumer_tasks:
             task.cancel()
+        await asyncio.gather(*self._consumer_tasks, return_exceptions=True)
         self._consumer_tasks.clear()
 
 
@@ -225,7 +260,7 @@ class KafkaTradeStream:
             from aiokafka import AIOKafkaProducer
             self._producer = AIOKafkaProducer(
                 bootstrap_servers=self.bootstrap,
-                value_serializer=lambda v: json.dumps(v, default=str).encode("utf-8"),
+                value_serializer=_dumps,
             )
             await self._producer.start()
             logger.info("Kafka producer initialized")
@@ -259,7 +294,7 @@ class KafkaTradeStream:
             consumer = AIOKafkaConsumer(
                 topic,
                 bootstrap_servers=self.bootstrap,
-                value_deserializer=lambda v: json.loads(v.decode("utf-8")),
+                value_deserializer=_loads,
                 group_id="signalforge-trading-engine",
                 auto_offset_reset="latest",
             )
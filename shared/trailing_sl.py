@@ -13,13 +13,49 @@ Strategies:
 Used by both Options Scalping Service and Intraday Stock Trading.
 """
 
-from enum import Enum
-from typing import Optional
-from dataclasses import dataclass, field
 import logging
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Deque, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    _loads = orjson.loads
+except ImportError:  # stdlib fallback — same wire format, just slower
+    import json
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    _loads = json.loads
+
+__all__ = [
+    "HistoryEntry",
+    "TrailConfig",
+    "TrailState",
+    "TrailStrategy",
+    "TrailingStopLossEngine",
+]
 
 logger = logging.getLogger("trailing_sl")
 
+# Positional layout for the compact wire format (state_to_bytes).
+# Append-only: new fields go at the end so older snapshots still decode.
+_STATE_FIELDS = (
+    "trade_id", "trade_type", "entry_price", "original_sl", "current_sl",
+    "peak_price", "trough_price", "trail_activated", "breakeven_set",
+    "step_level", "adjustments", "last_adjusted_price",
+)
+_HISTORY_FIELDS = ("old_sl", "new_sl", "price", "profit_pct", "step_level")
+
+# Adjustments kept in TrailState.history — older entries drop off on append
+_HISTORY_MAXLEN = 20
+
 
 class TrailStrategy(str, Enum):
     PERCENTAGE = "percentage"
@@ -28,9 +64,18 @@ class TrailStrategy(str, Enum):
     HYBRID = "hybrid"
 
 
-@dataclass
+class HistoryEntry(NamedTuple):
+    """One SL adjustment in TrailState.history. Field order matches _HISTORY_FIELDS."""
+    old_sl: float
+    new_sl: float
+    price: float
+    profit_pct: float
+    step_level: int
+
+
+@dataclass(frozen=True, slots=True)
 class TrailConfig:
-    """Configuration for trailing stop loss."""
+    """Configuration for trailing stop loss. Immutable — one instance can be shared across trades."""
     strategy: TrailStrategy = TrailStrategy.HYBRID
     # Percentage trail
     trail_pct: float = 0.5          # 0.5% default trail distance
@@ -50,7 +95,7 @@ class TrailConfig:
     include_costs: bool = True      # Factor in brokerage/taxes
 
 
-@dataclass
+@dataclass(slots=True)
 class TrailState:
     """Mutable state for an active trailing stop loss."""
     trade_id: str
@@ -65,7 +110,106 @@ class TrailState:
     step_level: int = 0             # Current step level reached
     adjustments: int = 0            # Number of SL adjustments made
     last_adjusted_price: float = 0.0
-    history: list = field(default_factory=list)  # Audit trail
+    history: Deque[HistoryEntry] = field(default_factory=lambda: deque(maxlen=_HISTORY_MAXLEN))  # Audit trail
+    direction: int = field(default=0, init=False)  # +1 long / -1 short (derived)
+
+    def __post_init__(self):
+        self.direction = 1 if self.trade_type.upper() in ("BUY", "LONG") else -1
+        if not isinstance(self.history, deque) or self.history.maxlen != _HISTORY_MAXLEN:
+            self.history = deque(self.history, maxlen=_HISTORY_MAXLEN)
+
+
+def _percentage_trail(
+    state: TrailState, price: float, config: TrailConfig,
+    direction: int, profit_pct: float, atr: Optional[float] = None,
+) -> Optional[float]:
+    """Simple percentage trail from peak/trough."""
+    if profit_pct < config.activation_pct:
+        return None
+
+    # Trail below peak (long) / above trough (short)
+    extreme = state.peak_price if direction > 0 else state.trough_price
+    return extreme * (1 - direction * config.trail_pct / 100)
+
+
+def _atr_trail(
+    state: TrailState, price: float, config: TrailConfig,
+    direction: int, profit_pct: float, atr: Optional[float] = None,
+) -> Optional[float]:
+    """ATR-based trailing stop."""
+    if atr is None or atr <= 0:
+        # Fallback to percentage trail
+        return _percentage_trail(state, price, config, direction, profit_pct)
+
+    extreme = state.peak_price if direction > 0 else state.trough_price
+    return extreme - direction * atr * config.atr_multiplier
+
+
+def _step_trail(
+    state: TrailState, price: float, config: TrailConfig,
+    direction: int, profit_pct: float, atr: Optional[float] = None,
+) -> Optional[float]:
+    """
+    Step-based trailing: move SL in discrete steps.
+    e.g., Every 0.5% profit move, lock in 0.3% of that step.
+    """
+    if config.step_size_pct <= 0:
+        return None
+
+    # Determine which step level we're at
+    current_step = int(profit_pct / config.step_size_pct)
+    if current_step <= state.step_level:
+        return None  # Haven't reached next step yet
+
+    # Calculate new SL: entry + (steps * lock_per_step)
+    locked_profit_pct = current_step * config.step_lock_pct
+    new_sl = state.entry_price * (1 + direction * locked_profit_pct / 100)
+
+    state.step_level = current_step
+    return new_sl
+
+
+def _hybrid_trail(
+    state: TrailState, price: float, config: TrailConfig,
+    direction: int, profit_pct: float, atr: Optional[float] = None,
+) -> Optional[float]:
+    """
+    Hybrid strategy:
+      Phase 1: Breakeven once activation_pct is reached
+      Phase 2: Step trail for moderate profit (0.5%-2%)
+      Phase 3: Tight percentage trail for high profit (>2%)
+    """
+    # Phase 1: Move to breakeven
+    if not state.breakeven_set and profit_pct >= config.breakeven_trigger_pct:
+        state.breakeven_set = True
+        return state.entry_price * (1 + direction * config.breakeven_buffer_pct / 100)
+
+    # Phase 2: Step trail (moderate profit)
+    if profit_pct < 2.0:
+        step_sl = _step_trail(state, price, config, direction, profit_pct)
+        if step_sl is not None:
+            return step_sl
+
+    # Phase 3: Tight percentage trail (high profit)
+    if profit_pct >= 1.5:
+        # Tighten trail as profit grows
+        dynamic_trail = max(config.min_trail_pct, config.trail_pct - (profit_pct * 0.1))
+        extreme = state.peak_price if direction > 0 else state.trough_price
+        return extreme * (1 - direction * dynamic_trail / 100)
+
+    return None
+
+
+# Shared default for callers that omit config
+_DEFAULT_CONFIG = TrailConfig()
+
+# Strategy dispatch — every helper shares the same signature
+_STRATEGY_DISPATCH = {
+    TrailStrategy.PERCENTAGE: _percentage_trail,
+    TrailStrategy.ATR_BASED: _atr_trail,
+    TrailStrategy.STEP_TRAIL: _step_trail,
+    TrailStrategy.HYBRID: _hybrid_trail,
+}
 
 
 class TrailingStopLossEngine:
@@ -78,7 +222,7 @@ class TrailingStopLossEngine:
     def compute_new_sl(
         state: TrailState,
         current_price: float,
-        config: TrailConfig = TrailConfig(),
+        config: Optional[TrailConfig] = None,
         atr: Optional[float] = None,
     ) -> Optional[float]:
         """
@@ -89,92 +233,58 @@ class TrailingStopLossEngine:
         """
         if current_price <= 0 or state.entry_price <= 0:
             return None
+        if config is None:
+            config = _DEFAULT_CONFIG
 
-        is_long = state.trade_type.upper() in ("BUY", "LONG")
+        direction = state.direction
 
         # Update peak/trough tracking
-        if is_long:
+        if direction > 0:
             if current_price > state.peak_price:
                 state.peak_price = current_price
-        else:
-            if state.trough_price == 0 or current_price < state.trough_price:
-                state.trough_price = current_price
+        elif state.trough_price == 0 or current_price < state.trough_price:
+            state.trough_price = current_price
 
-        # Calculate profit %
-        if is_long:
-            profit_pct = ((current_price - state.entry_price) / state.entry_price) * 100
-        else:
-            profit_pct = ((state.entry_price - current_price) / state.entry_price) * 100
+        # Calculate profit % (signed by direction)
+        profit_pct = direction * (current_price - state.entry_price) / state.entry_price * 100
 
         # Not in profit yet — no trailing
         if profit_pct <= 0:
             return None
 
-        new_sl = None
-
-        if config.strategy == TrailStrategy.PERCENTAGE:
-            new_sl = TrailingStopLossEngine._percentage_trail(
-                state, current_price, config, is_long, profit_pct
-            )
-        elif config.strategy == TrailStrategy.ATR_BASED:
-            new_sl = TrailingStopLossEngine._atr_trail(
-                state, current_price, config, is_long, atr
-            )
-        elif config.strategy == TrailStrategy.STEP_TRAIL:
-            new_sl = TrailingStopLossEngine._step_trail(
-                state, current_price, config, is_long, profit_pct
-            )
-        elif config.strategy == TrailStrategy.HYBRID:
-            new_sl = TrailingStopLossEngine._hybrid_trail(
-                state, current_price, config, is_long, profit_pct, atr
-            )
-
+        trail_fn = _STRATEGY_DISPATCH.get(config.strategy)
+        if trail_fn is None:
+            return None
+        new_sl = trail_fn(state, current_price, config, direction, profit_pct, atr)
         if new_sl is None:
             return None
 
         new_sl = round(new_sl, 2)
 
-        # Validate: SL must only tighten, never widen
-        if is_long:
-            if new_sl <= state.current_sl:
-                return None  # Would widen SL
-        else:
-            if new_sl >= state.current_sl:
-                return None  # Would widen SL
-
         # Validate: SL must not cross current price
-        if is_long and new_sl >= current_price:
-            return None
-        if not is_long and new_sl <= current_price:
+        if direction * (new_sl - current_price) >= 0:
             return None
 
-        # Validate: minimum trail distance
-        if is_long:
-            trail_dist_pct = ((current_price - new_sl) / current_price) * 100
-        else:
-            trail_dist_pct = ((new_sl - current_price) / current_price) * 100
-
-        if trail_dist_pct < config.min_trail_pct:
-            # Too close — enforce minimum distance
-            if is_long:
-                new_sl = round(current_price * (1 - config.min_trail_pct / 100), 2)
-            else:
-                new_sl = round(current_price * (1 + config.min_trail_pct / 100), 2)
-
-        # Final re-check after min distance enforcement
-        if is_long and new_sl <= state.current_sl:
-            return None
-        if not is_long and new_sl >= state.current_sl:
+        # Enforce minimum trail distance — clamp to the closest allowed SL
+        min_gap_sl = current_price * (1 - direction * config.min_trail_pct / 100)
+        if direction * (new_sl - min_gap_sl) > 0:
+            new_sl = round(min_gap_sl, 2)
+
+        # Validate: SL must only tighten, never widen. Checked once on the
+        # final value — the clamp only ever loosens, so a candidate that was
+        # already too loose stays rejected.
+        if direction * (new_sl - state.current_sl) <= 0:
             return None
 
-        # Record adjustment
-        state.history.append({
-            "old_sl": state.current_sl,
-            "new_sl": new_sl,
-            "price": current_price,
-            "profit_pct": round(profit_pct, 2),
-            "step_level": state.step_level,
-        })
+        # Record adjustment. Hot path: lazy %-formatting only, never f-strings.
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "%s trail SL %.2f -> %.2f @ %.2f (%.2f%%)",
+                state.trade_id, state.current_sl, new_sl, current_price, profit_pct,
+            )
+        state.history.append(HistoryEntry(
+            state.current_sl, new_sl, current_price, round(profit_pct, 2), state.step_level,
+        ))
         state.current_sl = new_sl
         state.last_adjusted_price = current_price
         state.adjustments += 1
@@ -183,112 +293,61 @@ class TrailingStopLossEngine:
         return new_sl
 
     @staticmethod
-    def _percentage_trail(
-        state: TrailState, price: float, config: TrailConfig,
-        is_long: bool, profit_pct: float,
-    ) -> Optional[float]:
-        """Simple percentage trail from peak/trough."""
-        if profit_pct < config.activation_pct:
-            return None
-
-        if is_long:
-            # Trail below peak
-            new_sl = state.peak_price * (1 - config.trail_pct / 100)
-        else:
-            # Trail above trough
-            new_sl = state.trough_price * (1 + config.trail_pct / 100)
-
-        return new_sl
-
-    @staticmethod
-    def _atr_trail(
-        state: TrailState, price: float, config: TrailConfig,
-        is_long: bool, atr: Optional[float],
-    ) -> Optional[float]:
-        """ATR-based trailing stop."""
-        if atr is None or atr <= 0:
-            # Fallback to percentage trail
-            return TrailingStopLossEngine._percentage_trail(
-                state, price, config, is_long,
-                ((price - state.entry_price) / state.entry_price) * 100 if is_long else
-                ((state.entry_price - price) / state.entry_price) * 100
-            )
-
-        trail_distance = atr * config.atr_multiplier
-
-        if is_long:
-            new_sl = state.peak_price - trail_distance
-        else:
-            new_sl = state.trough_price + trail_distance
-
-        return new_sl
-
-    @staticmethod
-    def _step_trail(
-        state: TrailState, price: float, config: TrailConfig,
-        is_long: bool, profit_pct: float,
-    ) -> Optional[float]:
+    def compute_new_sl_batch(
+        states_by_symbol: Dict[str, List[TrailState]],
+        ticks: Union[Dict[str, float], Iterable[Tuple[str, float]]],
+        config: Optional[TrailConfig] = None,
+        atr_by_symbol: Optional[Dict[str, float]] = None,
+    ) -> Dict[str, float]:
         """
-        Step-based trailing: move SL in discrete steps.
-        e.g., Every 0.5% profit move, lock in 0.3% of that step.
-        """
-        if config.step_size_pct <= 0:
-            return None
-
-        # Determine which step level we're at
-        current_step = int(profit_pct / config.step_size_pct)
-        if current_step <= state.step_level:
-            return None  # Haven't reached next step yet
+        Apply a batch of ticks to every open trade in one pass.
 
-        # Calculate new SL: entry + (steps * lock_per_step)
-        locked_profit_pct = current_step * config.step_lock_pct
+        Ticks are collapsed to the latest price per symbol first, so trades
+        sharing a symbol are evaluated against a single lookup. Intermediate
+        prices inside one batch do not update peak/trough — keep batches to
+        one polling interval.
 
-        if is_long:
-            new_sl = state.entry_price * (1 + locked_profit_pct / 100)
-        else:
-            new_sl = state.entry_price * (1 - locked_profit_pct / 100)
-
-        state.step_level = current_step
-        return new_sl
+        Returns:
+            {trade_id: new_sl} for trades whose SL was tightened.
+        """
+        if config is None:
+            config = _DEFAULT_CONFIG
+        latest = dict(ticks)
+        compute = TrailingStopLossEngine.compute_new_sl
+        updates: Dict[str, float] = {}
+        for symbol, price in latest.items():
+            states = states_by_symbol.get(symbol)
+            if not states:
+                continue
+            atr = atr_by_symbol.get(symbol) if atr_by_symbol else None
+            for state in states:
+                new_sl = compute(state, price, config, atr)
+                if new_sl is not None:
+                    updates[state.trade_id] = new_sl
+        return updates
 
     @staticmethod
-    def _hybrid_trail(
-        state: TrailState, price: float, config: TrailConfig,
-        is_long: bool, profit_pct: float, atr: Optional[float],
+    def replay_ticks(
+        state: TrailState,
+        prices: Iterable[float],
+        config: Optional[TrailConfig] = None,
+        atr: Optional[float] = None,
     ) -> Optional[float]:
         """
-        Hybrid strategy:
-          Phase 1: Breakeven once activation_pct is reached
-          Phase 2: Step trail for moderate profit (0.5%-2%)
-          Phase 3: Tight percentage trail for high profit (>2%)
-        """
-        # Phase 1: Move to breakeven
-        if not state.breakeven_set and profit_pct >= config.breakeven_trigger_pct:
-            state.breakeven_set = True
-            if is_long:
-                return state.entry_price * (1 + config.breakeven_buffer_pct / 100)
-            else:
-                return state.entry_price * (1 - config.breakeven_buffer_pct / 100)
-
-        # Phase 2: Step trail (moderate profit)
-        if profit_pct < 2.0:
-            step_sl = TrailingStopLossEngine._step_trail(
-                state, price, config, is_long, profit_pct
-            )
-            if step_sl is not None:
-                return step_sl
-
-        # Phase 3: Tight percentage trail (high profit)
-        if profit_pct >= 1.5:
-            # Tighten trail as profit grows
-            dynamic_trail = max(config.min_trail_pct, config.trail_pct - (profit_pct * 0.1))
-            if is_long:
-                new_sl = state.peak_price * (1 - dynamic_trail / 100)
-            else:
-                new_sl = state.trough_price * (1 + dynamic_trail / 100)
-            return new_sl
+        Feed a price path for one trade through compute_new_sl in order.
 
-        return None
+        Returns:
+            The last SL set along the path, or None if it never moved.
+        """
+        if config is None:
+            config = _DEFAULT_CONFIG
+        compute = TrailingStopLossEngine.compute_new_sl
+        last_sl = None
+        for price in prices:
+            new_sl = compute(state, price, config, atr)
+            if new_sl is not None:
+                last_sl = new_sl
+        return last_sl
 
     @staticmethod
     def create_state(
@@ -310,7 +369,10 @@ class TrailingStopLossEngine:
 
     @staticmethod
     def state_to_dict(state: TrailState) -> dict:
-        """Serialize TrailState to dict for JSON persistence."""
+        """
+        Serialize TrailState to dict (legacy / API form).
+        Prefer state_to_bytes() for Redis snapshots.
+        """
         return {
             "trade_id": state.trade_id,
             "trade_type": state.trade_type,
@@ -324,7 +386,7 @@ class TrailingStopLossEngine:
             "step_level": state.step_level,
             "adjustments": state.adjustments,
             "last_adjusted_price": state.last_adjusted_price,
-            "history": state.history[-20:],  # Keep last 20 adjustments
+            "history": [h._asdict() for h in state.history],
         }
 
     @staticmethod
@@ -343,5 +405,26 @@ class TrailingStopLossEngine:
             step_level=d.get("step_level", 0),
             adjustments=d.get("adjustments", 0),
             last_adjusted_price=d.get("last_adjusted_price", 0),
-            history=d.get("history", []),
+            history=[
+                HistoryEntry(*(h.get(k) for k in _HISTORY_FIELDS)) for h in d.get("history", ())
+            ],
         )
+
+    @staticmethod
+    def state_to_bytes(state: TrailState) -> bytes:
+        """
+        Serialize TrailState to a compact positional array.
+        History rows are packed as [old_sl, new_sl, price, profit_pct, step_level]
+        instead of objects — roughly half the bytes of state_to_dict + json.
+        """
+        row = [getattr(state, f) for f in _STATE_FIELDS]
+        row.append([list(h) for h in state.history])
+        return _dumps(row)
+
+    @staticmethod
+    def state_from_bytes(data: bytes) -> TrailState:
+        """Deserialize TrailState from state_to_bytes() output."""
+        row = _loads(data)
+        kwargs = dict(zip(_STATE_FIELDS, row[:-1]))
+        kwargs["history"] = [HistoryEntry(*h) for h in row[-1]]
+        return TrailState(**kwargs)
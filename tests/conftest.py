@@ -0,0 +1,63 @@
+"""
+Shared pytest fixtures for the test suite.
+"""
+import asyncio
+
+import pytest
+
+try:
+    import uvloop
+except ImportError:  # ships with uvicorn[standard]; absent on Windows
+    uvloop = None
+
+from shared.broker_interface import BrokerRouter, PaperBroker
+from shared.iceberg_order import IcebergEngine
+
+if uvloop is not None:
+    def pytest_asyncio_loop_factories(config, item):
+        """Run async tests on uvloop when it is installed."""
+        return {"uvloop": uvloop.new_event_loop}
+
+
+@pytest.fixture(autouse=True)
+def _no_slice_delay(monkeypatch):
+    """Iceberg slices are placed back-to-back in tests — no inter-slice wait."""
+    monkeypatch.setattr(IcebergEngine, "OPTION_SLICE_DELAY_MS", 0)
+    monkeypatch.setattr(IcebergEngine, "STOCK_SLICE_DELAY_MS", 0)
+
+
+@pytest.fixture(scope="module")
+def _module_paper_broker():
+    return PaperBroker()
+
+
+@pytest.fixture
+def paper_broker(_module_paper_broker):
+    """One PaperBroker per test module, with its order book cleared for every test."""
+    _module_paper_broker._orders.clear()
+    return _module_paper_broker
+
+
+@pytest.fixture(scope="module")
+def _module_broker_router():
+    return BrokerRouter()
+
+
+@pytest.fixture
+def broker_router(_module_broker_router):
+    """Module-shared router; paper brokers it has handed out start each test empty."""
+    for broker in BrokerRouter._instances.values():
+        if isinstance(broker, PaperBroker):
+            broker._orders.clear()
+    return _module_broker_router
+
+
+@pytest.fixture(scope="module")
+def filled_iceberg():
+    """A fully filled 1000-share stock iceberg, executed once per module (read-only)."""
+    async def fill(symbol, trade_type, quantity, price, **kwargs):
+        return {"status": "filled", "fill_price": price, "order_id": "X1"}
+
+    order = IcebergEngine.create_stock_iceberg("A", "BUY", 1000, 100.0)
+    order.slice_delay_ms = 0  # built before the function-scoped delay patch applies
+    return asyncio.run(IcebergEngine.execute(order, fill))
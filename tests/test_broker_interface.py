@@ -41,7 +41,6 @@ class TestPaperBroker:
     def broker(self):
         return PaperBroker()
 
-    @pytest.mark.asyncio
     async def test_place_buy_order(self, broker):
         result = await broker.place_order(
             symbol="RELIANCE",
@@ -57,7 +56,6 @@ class TestPaperBroker:
         assert result.fill_price >= 2500.0
         assert result.fill_price <= 2500.0 * 1.001
 
-    @pytest.mark.asyncio
     async def test_place_sell_order(self, broker):
         result = await broker.place_order(
             symbol="TCS",
@@ -70,7 +68,6 @@ class TestPaperBroker:
         assert result.fill_price <= 3300.0
         assert result.fill_price >= 3300.0 * 0.999
 
-    @pytest.mark.asyncio
     async def test_place_multiple_orders(self, broker):
         """Place multiple orders and check uniqueness."""
         results = []
@@ -80,42 +77,35 @@ class TestPaperBroker:
         order_ids = [r.order_id for r in results]
         assert len(set(order_ids)) == 5  # All unique
 
-    @pytest.mark.asyncio
     async def test_get_positions(self, broker):
         await broker.place_order("INFY", OrderSide.BUY, 100, 1500.0)
         positions = await broker.get_positions()
         assert isinstance(positions, list)
         assert len(positions) >= 1
 
-    @pytest.mark.asyncio
     async def test_cancel_order(self, broker):
         placed = await broker.place_order("HDFC", OrderSide.BUY, 50, 1600.0)
         result = await broker.cancel_order(placed.order_id)
         assert result.status == "cancelled"
 
-    @pytest.mark.asyncio
     async def test_modify_order(self, broker):
         placed = await broker.place_order("WIPRO", OrderSide.BUY, 50, 400.0)
         result = await broker.modify_order(placed.order_id, price=405.0)
         assert result.status in ("modified", "filled")
 
-    @pytest.mark.asyncio
     async def test_update_stop_loss(self, broker):
         placed = await broker.place_order("SBI", OrderSide.BUY, 100, 600.0)
         result = await broker.update_stop_loss(placed.order_id, new_sl=590.0)
         assert result.status in ("updated", "filled", "modified")
 
-    @pytest.mark.asyncio
     async def test_get_order_status(self, broker):
         placed = await broker.place_order("AXIS", OrderSide.BUY, 50, 1100.0)
         result = await broker.get_order_status(placed.order_id)
         assert result.status == "filled"
 
-    @pytest.mark.asyncio
     async def test_is_connected(self, broker):
         assert await broker.is_connected() is True
 
-    @pytest.mark.asyncio
     async def test_cancel_nonexistent_order(self, broker):
         result = await broker.cancel_order("FAKE-ORDER-123")
         assert result.status in ("failed", "not_found")
@@ -134,7 +124,6 @@ class TestBrokerRouter:
         broker = router.get_broker("unknown_broker_xyz")
         assert isinstance(broker, PaperBroker)
 
-    @pytest.mark.asyncio
     async def test_route_order_via_paper(self):
         router = BrokerRouter()
         result = await router.get_broker("paper").place_order(
@@ -3,12 +3,41 @@ End-to-end integration tests — Full trade lifecycle.
 Tests the flow: TradeMessage → IcebergEngine → PaperBroker → TrailingStopLossEngine
 """
 import asyncio
+import copy
+
 import pytest
-from shared.trailing_sl import TrailingStopLossEngine, TrailConfig, TrailStrategy
+
+from shared.broker_interface import OrderSide, PaperBroker
 from shared.iceberg_order import IcebergEngine, IcebergStatus
-from shared.broker_interface import PaperBroker, BrokerRouter, OrderSide
-from shared.trade_stream import TradeMessage, InMemoryTradeStream, TOPIC_TRADE_REQUEST
-from shared.models import BrokerType, BrokerConfig
+from shared.models import BrokerConfig, BrokerType
+from shared.trade_stream import TOPIC_TRADE_REQUEST, InMemoryTradeStream, TradeMessage
+from shared.trailing_sl import TrailConfig, TrailingStopLossEngine, TrailStrategy
+
+
+def _paper_fill(broker, side):
+    """Broker callback for IcebergEngine.execute that fills each slice on the paper broker."""
+    async def broker_fill(symbol, trade_type, quantity, price, **kwargs):
+        result = await broker.place_order(
+            symbol=symbol, side=side,
+            quantity=quantity, price=price,
+        )
+        return {
+            "status": result.status,
+            "fill_price": result.fill_price,
+            "order_id": result.order_id,
+        }
+
+    return broker_fill
+
+
+@pytest.fixture(scope="module")
+def filled_option_iceberg():
+    """An 8-lot BANKNIFTY option iceberg filled on a paper broker, once per module (read-only)."""
+    order = IcebergEngine.create_option_iceberg(
+        "BANKNIFTY", "BUY", lots=8, premium=200.0, lot_size=25,
+    )
+    order.slice_delay_ms = 0  # built before the function-scoped delay patch applies
+    return asyncio.run(IcebergEngine.execute(order, _paper_fill(PaperBroker(), OrderSide.BUY)))
 
 
 class TestE2EOptionsTrade:
@@ -17,10 +46,8 @@ class TestE2EOptionsTrade:
     Iceberg splits into slices → PaperBroker fills → Trailing SL tracks.
     """
 
-    @pytest.mark.asyncio
-    async def test_full_options_lifecycle(self):
-        broker = PaperBroker()
-
+    @pytest.mark.slow
+    async def test_full_options_lifecycle(self, paper_broker):
         # 1) Create iceberg order for 10-lot option
         lots = 10
         lot_size = 65
@@ -38,18 +65,7 @@ class TestE2EOptionsTrade:
         assert len(order.slices) == 5  # 2 lots per slice
 
         # 2) Execute via PaperBroker
-        async def broker_fill(symbol, trade_type, quantity, price, **kwargs):
-            result = await broker.place_order(
-                symbol=symbol,
-                side=OrderSide.BUY,
-                quantity=quantity,
-                price=price,
-            )
-            return {
-                "status": result.status,
-                "fill_price": result.fill_price,
-                "order_id": result.order_id,
-            }
+        broker_fill = _paper_fill(paper_broker, OrderSide.BUY)
 
         filled_order = await IcebergEngine.execute(order, broker_fill)
         assert filled_order.status == IcebergStatus.FILLED
@@ -68,19 +84,15 @@ class TestE2EOptionsTrade:
 
         config = TrailConfig(strategy=TrailStrategy.HYBRID)
 
-        # 4) Simulate price movement
-        prices = [
-            avg_price * 1.005,  # 0.5% up
-            avg_price * 1.01,   # 1% up
-            avg_price * 1.02,   # 2% up
-            avg_price * 1.015,  # pulls back to 1.5%
-            avg_price * 1.03,   # 3% up
-        ]
+        # 4) Simulate price movement: 0.5%, 1%, 2% up, pull back to 1.5%, then 3%
+        prices = [avg_price * m for m in (1.005, 1.01, 1.02, 1.015, 1.03)]
 
-        sl_values = [state.current_sl]
+        scalar = copy.deepcopy(state)
         for p in prices:
-            TrailingStopLossEngine.compute_new_sl(state, p, config)
-            sl_values.append(state.current_sl)
+            TrailingStopLossEngine.compute_new_sl(scalar, p, config)
+
+        TrailingStopLossEngine.replay_ticks(state, prices, config)
+        assert state.current_sl == scalar.current_sl
 
         # SL should have moved up from initial
         assert state.current_sl > initial_sl
@@ -91,12 +103,11 @@ class TestE2EOptionsTrade:
         # Trail should be activated
         assert state.trail_activated is True
 
-    @pytest.mark.asyncio
-    async def test_stream_to_iceberg_to_fill(self):
+    @pytest.mark.slow
+    async def test_stream_to_iceberg_to_fill(self, paper_broker):
         """Test TradeMessage → Stream → IcebergEngine → PaperBroker."""
         stream = InMemoryTradeStream()
-        broker = PaperBroker()
-        results = []
+        filled_future = asyncio.get_running_loop().create_future()
 
         async def trade_handler(msg: TradeMessage):
             if msg.iceberg and msg.lots > 5:
@@ -108,7 +119,7 @@ class TestE2EOptionsTrade:
                 )
 
                 async def fill(symbol, trade_type, quantity, price, **kwargs):
-                    result = await broker.place_order(
+                    result = await paper_broker.place_order(
                         symbol=symbol, side=OrderSide.BUY,
                         quantity=quantity, price=price,
                     )
@@ -118,8 +129,7 @@ class TestE2EOptionsTrade:
                         "order_id": result.order_id,
                     }
 
-                filled = await IcebergEngine.execute(order, fill)
-                results.append(filled)
+                filled_future.set_result(await IcebergEngine.execute(order, fill))
 
         stream.subscribe(TOPIC_TRADE_REQUEST, trade_handler)
         await stream.start()
@@ -139,13 +149,12 @@ class TestE2EOptionsTrade:
         )
         await stream.publish(TOPIC_TRADE_REQUEST, msg)
 
-        # Give time for handlers + iceberg execution (5 slices x 300ms + overhead)
-        await asyncio.sleep(3.0)
+        # Await the handler's iceberg result directly (5 slices + paper broker latency)
+        filled = await asyncio.wait_for(filled_future, timeout=5.0)
         await stream.stop()
 
-        assert len(results) == 1
-        assert results[0].status == IcebergStatus.FILLED
-        assert results[0].filled_quantity == 650
+        assert filled.status == IcebergStatus.FILLED
+        assert filled.filled_quantity == 650
 
 
 class TestE2EStockTrade:
@@ -154,8 +163,8 @@ class TestE2EStockTrade:
     Iceberg splits → PaperBroker fills → Trailing SL activates.
     """
 
-    @pytest.mark.asyncio
-    async def test_leveraged_stock_lifecycle(self):
+    @pytest.mark.slow
+    async def test_leveraged_stock_lifecycle(self, paper_broker):
         # 3x leverage: capital 5L → can buy 15L worth
         capital = 500_000
         price = 2500.0
@@ -173,18 +182,7 @@ class TestE2EStockTrade:
         assert order.total_quantity == 600
         assert len(order.slices) == 2  # 500 + 100
 
-        broker = PaperBroker()
-
-        async def broker_fill(symbol, trade_type, quantity, price, **kwargs):
-            result = await broker.place_order(
-                symbol=symbol, side=OrderSide.BUY,
-                quantity=quantity, price=price,
-            )
-            return {
-                "status": result.status,
-                "fill_price": result.fill_price,
-                "order_id": result.order_id,
-            }
+        broker_fill = _paper_fill(paper_broker, OrderSide.BUY)
 
         filled = await IcebergEngine.execute(order, broker_fill)
         assert filled.status == IcebergStatus.FILLED
@@ -221,24 +219,26 @@ class TestE2EStockTrade:
 class TestE2EBrokerSelection:
     """Test broker routing with user config."""
 
-    def test_broker_config_model(self):
-        config = BrokerConfig(
-            broker_type=BrokerType.DHAN,
-            dhan_client_id="test_client",
-            dhan_access_token="test_token",
-        )
-        assert config.broker_type == BrokerType.DHAN
-        assert config.dhan_client_id == "test_client"
-        assert config.dhan_access_token == "test_token"
-
-    def test_broker_config_paper_default(self):
-        config = BrokerConfig()
-        assert config.broker_type == BrokerType.NONE
-
-    @pytest.mark.asyncio
-    async def test_router_paper_order(self):
-        router = BrokerRouter()
-        broker = router.get_broker("paper")
+    @pytest.mark.parametrize("kwargs,expected_type,expected_client_id", [
+        (
+            {
+                "broker_type": BrokerType.DHAN,
+                "dhan_client_id": "test_client",
+                "dhan_access_token": "test_token",
+            },
+            BrokerType.DHAN,
+            "test_client",
+        ),
+        ({}, BrokerType.NONE, None),  # paper default
+    ])
+    def test_broker_config(self, kwargs, expected_type, expected_client_id):
+        config = BrokerConfig(**kwargs)
+        assert config.broker_type == expected_type
+        assert config.dhan_client_id == expected_client_id
+        assert config.dhan_access_token == kwargs.get("dhan_access_token")
+
+    async def test_router_paper_order(self, broker_router):
+        broker = broker_router.get_broker("paper")
         result = await broker.place_order(
             "NIFTY", OrderSide.BUY, 100, 20000.0,
         )
@@ -248,25 +248,13 @@ class TestE2EBrokerSelection:
 class TestE2EShortTrade:
     """Test short/SELL trade flow with trailing SL."""
 
-    @pytest.mark.asyncio
-    async def test_short_sell_with_trailing_sl(self):
-        broker = PaperBroker()
-
+    async def test_short_sell_with_trailing_sl(self, paper_broker):
         # Short sell NIFTY futures
         order = IcebergEngine.create_stock_iceberg(
             "NIFTY25FEB", "SELL", quantity=600, price=23000.0,
         )
 
-        async def broker_fill(symbol, trade_type, quantity, price, **kwargs):
-            result = await broker.place_order(
-                symbol=symbol, side=OrderSide.SELL,
-                quantity=quantity, price=price,
-            )
-            return {
-                "status": result.status,
-                "fill_price": result.fill_price,
-                "order_id": result.order_id,
-            }
+        broker_fill = _paper_fill(paper_broker, OrderSide.SELL)
 
         filled = await IcebergEngine.execute(order, broker_fill)
         assert filled.status == IcebergStatus.FILLED
@@ -289,20 +277,9 @@ class TestE2EShortTrade:
 class TestE2ESerializationAcrossModules:
     """Test that serialized data from one module can be used by another."""
 
-    @pytest.mark.asyncio
-    async def test_iceberg_order_serialization_with_trail_state(self):
+    def test_iceberg_order_serialization_with_trail_state(self, filled_option_iceberg):
         """Simulate persisting trade state to JSON and restoring."""
-        # Create and fill iceberg
-        order = IcebergEngine.create_option_iceberg(
-            "BANKNIFTY", "BUY", lots=8, premium=200.0, lot_size=25,
-        )
-        broker = PaperBroker()
-
-        async def fill(symbol, trade_type, quantity, price, broker_name, user_id, slice_id):
-            r = await broker.place_order(symbol, OrderSide.BUY, quantity, price)
-            return {"status": r.status, "fill_price": r.fill_price, "order_id": r.order_id}
-
-        await IcebergEngine.execute(order, fill)
+        order = filled_option_iceberg
 
         # Serialize iceberg state
         order_dict = IcebergEngine.order_to_dict(order)
@@ -337,5 +314,29 @@ class TestE2ESerializationAcrossModules:
         restored_order = IcebergEngine.order_from_dict(order_dict)
 
         assert restored_msg.user_id == "user_x"
+        assert restored_msg.lots == 8
         assert restored_trail.trade_id == order.iceberg_id
-        assert restored_order.filled_quantity == order.filled_quantity
+        assert restored_order.filled_quantity == order.filled_quantity == 200
+        assert restored_order.status == IcebergStatus.FILLED
+        # 2 lots x 25 per slice → four 50-qty option slices survive the round trip
+        assert restored_order.max_slice_qty == 50
+        assert restored_order.slices == order.slices
+        assert [sl.quantity for sl in restored_order.slices] == [50, 50, 50, 50]
+
+    def test_trade_message_dict_is_orjson_clean(self, filled_iceberg):
+        """Message payloads (incl. nested trail state) must encode with orjson as-is."""
+        orjson = pytest.importorskip("orjson")
+        trail = TrailingStopLossEngine.create_state(
+            filled_iceberg.iceberg_id, "BUY",
+            filled_iceberg.avg_fill_price, filled_iceberg.avg_fill_price * 0.95,
+        )
+        msg = TradeMessage(
+            user_id="user_x", user_email="x@y.com",
+            action="PLACE", symbol=filled_iceberg.symbol,
+            metadata={
+                "iceberg": IcebergEngine.order_to_dict(filled_iceberg),
+                "trail_state": TrailingStopLossEngine.state_to_dict(trail),
+            },
+        )
+        msg_dict = msg.to_dict()
+        assert orjson.loads(orjson.dumps(msg_dict)) == msg_dict
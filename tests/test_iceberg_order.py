@@ -2,6 +2,8 @@
 Integration tests for shared/iceberg_order.py — Iceberg Order Engine.
 Tests order splitting, execution, serialization, and edge cases.
 """
+from itertools import count
+
 import pytest
 from shared.iceberg_order import (
     IcebergEngine,
@@ -10,28 +12,38 @@ from shared.iceberg_order import (
 )
 
 
-class TestIcebergThresholds:
-    """Test should_iceberg_* logic."""
+_MARGIN_FAILURE = {"status": "failed", "error": "Insufficient margin"}
 
-    def test_option_below_threshold(self):
-        assert IcebergEngine.should_iceberg_option(3) is False
-        assert IcebergEngine.should_iceberg_option(4) is False
 
-    def test_option_at_threshold(self):
-        """5 lots triggers iceberg — splits into 2+2+1 slices."""
-        assert IcebergEngine.should_iceberg_option(5) is True
+class _CallCounter:
+    """Slice call counter for place_order mocks."""
+    __slots__ = ("n",)
 
-    def test_option_above_threshold(self):
-        assert IcebergEngine.should_iceberg_option(6) is True
-        assert IcebergEngine.should_iceberg_option(10) is True
+    def __init__(self):
+        self.n = 0
 
-    def test_stock_below_threshold(self):
-        assert IcebergEngine.should_iceberg_stock(200) is False
-        assert IcebergEngine.should_iceberg_stock(500) is False
 
-    def test_stock_above_threshold(self):
-        assert IcebergEngine.should_iceberg_stock(501) is True
-        assert IcebergEngine.should_iceberg_stock(1500) is True
+class TestIcebergThresholds:
+    """Test should_iceberg_* logic."""
+
+    @pytest.mark.parametrize("lots,expected", [
+        (3, False),
+        (4, False),
+        (5, True),   # 5 lots triggers iceberg — splits into 2+2+1 slices
+        (6, True),
+        (10, True),
+    ])
+    def test_option_threshold(self, lots, expected):
+        assert IcebergEngine.should_iceberg_option(lots) is expected
+
+    @pytest.mark.parametrize("qty,expected", [
+        (200, False),
+        (500, False),
+        (501, True),
+        (1500, True),
+    ])
+    def test_stock_threshold(self, qty, expected):
+        assert IcebergEngine.should_iceberg_stock(qty) is expected
 
 
 class TestIcebergCreation:
@@ -155,11 +167,11 @@ class TestIcebergExecution:
     @pytest.fixture
     def partial_fail_fn(self):
         """Mock that fails on 2nd slice."""
-        call_count = {"n": 0}
+        calls = _CallCounter()
         async def place_order(symbol, trade_type, quantity, price, broker, user_id, slice_id):
-            call_count["n"] += 1
-            if call_count["n"] == 2:
-                return {"status": "failed", "error": "Insufficient margin"}
+            calls.n += 1
+            if calls.n == 2:
+                return _MARGIN_FAILURE
             return {
                 "status": "filled",
                 "fill_price": price,
@@ -167,7 +179,6 @@ class TestIcebergExecution:
             }
         return place_order
 
-    @pytest.mark.asyncio
     async def test_full_execution_success(self, success_order_fn):
         order = IcebergEngine.create_stock_iceberg(
             "RELIANCE", "BUY", quantity=1000, price=2500.0,
@@ -180,7 +191,6 @@ class TestIcebergExecution:
         for s in result.slices:
             assert s.status == SliceStatus.FILLED
 
-    @pytest.mark.asyncio
     async def test_partial_fill(self, partial_fail_fn):
         order = IcebergEngine.create_stock_iceberg(
             "TCS", "BUY", quantity=1500, price=3300.0,
@@ -191,17 +201,15 @@ class TestIcebergExecution:
         failed_slices = [s for s in result.slices if s.status == SliceStatus.FAILED]
         assert len(failed_slices) == 1
 
-    @pytest.mark.asyncio
     async def test_cancel_check(self, success_order_fn):
         order = IcebergEngine.create_stock_iceberg(
             "INFY", "BUY", quantity=1500, price=1500.0,
         )
         # cancel_check_fn is called at the start of each slice iteration.
         # Return False for the first slice (let it fill), True for slice 2+.
-        fill_count = {"n": 0}
+        checks = count()
         def cancel_after_first():
-            fill_count["n"] += 1
-            return fill_count["n"] > 1  # Allow 1st iteration, cancel from 2nd
+            return next(checks) > 0  # Allow 1st iteration, cancel from 2nd
 
         result = await IcebergEngine.execute(
             order, success_order_fn, cancel_check_fn=cancel_after_first,
@@ -213,7 +221,6 @@ class TestIcebergExecution:
         assert len(cancelled) >= 1
         assert result.status in (IcebergStatus.CANCELLED, IcebergStatus.PARTIALLY_FILLED)
 
-    @pytest.mark.asyncio
     async def test_avg_fill_price_calculation(self, success_order_fn):
         order = IcebergEngine.create_stock_iceberg(
             "HDFC", "BUY", quantity=1000, price=1600.0,
@@ -237,15 +244,8 @@ class TestIcebergSerialization:
         assert len(restored.slices) == len(order.slices)
         assert restored.status == order.status
 
-    @pytest.mark.asyncio
-    async def test_filled_order_roundtrip(self):
-        async def mock_fill(symbol, trade_type, quantity, price, broker, user_id, slice_id):
-            return {"status": "filled", "fill_price": price, "order_id": "X1"}
-
-        order = IcebergEngine.create_stock_iceberg("A", "BUY", 1000, 100.0)
-        await IcebergEngine.execute(order, mock_fill)
-
-        d = IcebergEngine.order_to_dict(order)
+    def test_filled_order_roundtrip(self, filled_iceberg):
+        d = IcebergEngine.order_to_dict(filled_iceberg)
         restored = IcebergEngine.order_from_dict(d)
         assert restored.status == IcebergStatus.FILLED
         assert restored.filled_quantity == 1000
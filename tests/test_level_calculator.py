@@ -3,7 +3,7 @@ import pytest
 from services.recommendation_engine.level_calculator import LevelCalculator
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def calc():
     return LevelCalculator(min_rr=2.0)
 
@@ -19,15 +19,6 @@ class TestLevelCalculatorUp:
         assert levels["target1"] > 1000.0
         assert levels["target2"] > levels["target1"]
 
-    def test_rr_ratio_at_least_2(self, calc):
-        levels = calc.calculate_levels(current_price=500.0, atr=10.0, direction="UP")
-        assert levels["rr"] >= 2.0
-
-    def test_stop_loss_uses_atr(self, calc):
-        levels = calc.calculate_levels(current_price=100.0, atr=5.0, direction="UP")
-        # Intraday mode: SL = 0.4×ATR capped at 1.5% of price → min(2.0, 1.5) = 1.5
-        assert levels["sl"] == pytest.approx(98.5, abs=0.01)
-
     def test_vix_widens_levels(self, calc):
         normal = calc.calculate_levels(current_price=1000.0, atr=20.0, direction="UP", vix=10.0)
         high_vix = calc.calculate_levels(current_price=1000.0, atr=20.0, direction="UP", vix=22.0)
@@ -35,13 +26,10 @@ class TestLevelCalculatorUp:
         assert high_vix["sl"] < normal["sl"]
         assert high_vix["target1"] > normal["target1"]
 
-    def test_extreme_vix(self, calc):
-        levels = calc.calculate_levels(current_price=1000.0, atr=20.0, direction="UP", vix=30.0)
-        assert levels["vix_multiplier"] == 1.5
-
-    def test_vix_multiplier_default(self, calc):
-        levels = calc.calculate_levels(current_price=1000.0, atr=20.0, direction="UP", vix=0.0)
-        assert levels["vix_multiplier"] == 1.0
+    @pytest.mark.parametrize("vix,multiplier", [(30.0, 1.5), (0.0, 1.0)])
+    def test_vix_multiplier(self, calc, vix, multiplier):
+        levels = calc.calculate_levels(current_price=1000.0, atr=20.0, direction="UP", vix=vix)
+        assert levels["vix_multiplier"] == multiplier
 
 
 class TestLevelCalculatorDown:
@@ -55,34 +43,36 @@ class TestLevelCalculatorDown:
         assert levels["target1"] < 1000.0
         assert levels["target2"] < levels["target1"]
 
-    def test_rr_ratio_at_least_2_down(self, calc):
-        levels = calc.calculate_levels(current_price=500.0, atr=10.0, direction="DOWN")
+
+class TestLevelCalculatorBothDirections:
+    """Checks that hold symmetrically for UP and DOWN."""
+
+    @pytest.mark.parametrize("direction", ["UP", "DOWN"])
+    def test_rr_ratio_at_least_2(self, calc, direction):
+        levels = calc.calculate_levels(current_price=500.0, atr=10.0, direction=direction)
         assert levels["rr"] >= 2.0
 
-    def test_stop_loss_above_entry(self, calc):
-        levels = calc.calculate_levels(current_price=100.0, atr=5.0, direction="DOWN")
+    @pytest.mark.parametrize("direction,expected_sl", [("UP", 98.5), ("DOWN", 101.5)])
+    def test_stop_loss_uses_atr(self, calc, direction, expected_sl):
+        levels = calc.calculate_levels(current_price=100.0, atr=5.0, direction=direction)
         # Intraday mode: SL = 0.4×ATR capped at 1.5% of price → min(2.0, 1.5) = 1.5
-        assert levels["sl"] == pytest.approx(101.5, abs=0.01)
+        assert levels["sl"] == pytest.approx(expected_sl, abs=0.01)
 
 
 class TestLevelCalculatorEdgeCases:
-    def test_zero_atr_returns_none(self, calc):
-        result = calc.calculate_levels(current_price=100.0, atr=0.0, direction="UP")
-        assert result is None
-
-    def test_negative_atr_returns_none(self, calc):
-        result = calc.calculate_levels(current_price=100.0, atr=-5.0, direction="UP")
+    @pytest.mark.parametrize("atr,direction", [
+        (0.0, "UP"),         # zero ATR
+        (-5.0, "UP"),        # negative ATR
+        (10.0, "SIDEWAYS"),  # invalid direction
+    ])
+    def test_invalid_inputs_return_none(self, calc, atr, direction):
+        result = calc.calculate_levels(current_price=100.0, atr=atr, direction=direction)
         assert result is None
 
-    def test_invalid_direction_returns_none(self, calc):
-        result = calc.calculate_levels(current_price=100.0, atr=10.0, direction="SIDEWAYS")
-        assert result is None
-
-    def test_case_insensitive_direction(self, calc):
-        up = calc.calculate_levels(current_price=100.0, atr=5.0, direction="up")
-        assert up is not None
-        down = calc.calculate_levels(current_price=100.0, atr=5.0, direction="Down")
-        assert down is not None
+    @pytest.mark.parametrize("direction", ["up", "Down"])
+    def test_case_insensitive_direction(self, calc, direction):
+        levels = calc.calculate_levels(current_price=100.0, atr=5.0, direction=direction)
+        assert levels is not None
 
     def test_symmetry(self, calc):
         """UP and DOWN with same params should produce symmetric risk:reward."""
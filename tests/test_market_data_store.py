@@ -1,21 +1,44 @@
 """Unit tests for MarketDataStore — indicators, rolling window, OR lock."""
 
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
-from datetime import datetime
+from datetime import datetime, timedelta
 from shared.market_data_store import MarketDataStore, Candle, OptionDataStore, PremiumCandle
 
 
+_SESSION_START = datetime(2025, 3, 10, 9, 15)
+
+
 def _candle(minute: int, o: float, h: float, lo: float, c: float, v: int = 100000, oi: float = 0) -> Candle:
-    total_min = 15 + minute
-    hour = 9 + total_min // 60
-    mins = total_min % 60
-    ts = datetime(2025, 3, 10, hour, mins)
+    ts = _SESSION_START + timedelta(minutes=minute)
     return Candle(timestamp=ts, open=o, high=h, low=lo, close=c, volume=v, oi=oi)
 
 
+def _rising_candles(n: int) -> list:
+    """*n* 1-min candles whose prices climb by one point per bar."""
+    return [_candle(i, 100 + i, 101 + i, 99 + i, 100.5 + i) for i in range(n)]
+
+
+def _reference_atr(candles: list, period: int = 14) -> float:
+    """Full-recompute ATR (SMA of True Range over the last *period* bars)."""
+    trs = [
+        max(c.high - c.low, abs(c.high - prev.close), abs(c.low - prev.close))
+        for prev, c in zip(candles, candles[1:])
+    ]
+    window = trs[-period:]
+    return sum(window) / len(window)
+
+
+def _reference_rsi(candles: list, period: int = 7) -> float:
+    """Full-recompute simple-average RSI over the last *period* deltas."""
+    closes = [c.close for c in candles[-(period + 1):]]
+    deltas = [b - a for a, b in zip(closes, closes[1:])]
+    gain = sum(d for d in deltas if d >= 0)
+    loss = -sum(d for d in deltas if d < 0)
+    if loss == 0:
+        return 100.0
+    rs = (gain / period) / (loss / period)
+    return 100.0 - 100.0 / (1.0 + rs)
+
+
 class TestMarketDataStore:
     def test_add_candle_and_count(self):
         store = MarketDataStore("TEST")
@@ -26,12 +49,20 @@ class TestMarketDataStore:
     def test_rolling_window_limit(self):
         store = MarketDataStore("TEST")
         # MAX_CANDLES = 120; fill more than that
-        for i in range(130):
-            store.add_candle(_candle(i, 100 + i, 101 + i, 99 + i, 100.5 + i))
+        for c in _rising_candles(130):
+            store.add_candle(c)
         assert store.candle_count == 120
         candles = store.get_candles()
         assert len(candles) == 120
 
+    def test_add_candles_matches_add_candle(self):
+        one, batch = MarketDataStore("A"), MarketDataStore("B")
+        candles = _rising_candles(30)
+        for c in candles:
+            one.add_candle(c)
+        assert batch.add_candles(candles) == one.indicators
+        assert batch.candle_count == 30
+
     def test_get_candles_n(self):
         store = MarketDataStore("TEST")
         for i in range(20):
@@ -61,6 +92,14 @@ class TestMarketDataStore:
         # ATR should reflect the 4-point range
         assert 2 < store.indicators.atr_14 < 6
 
+    def test_incremental_matches_full_recompute(self):
+        store = MarketDataStore("TEST")
+        for i in range(130):
+            store.add_candle(_candle(i, 100, 101 + i % 4, 98 - i % 3, 100 + (i % 7) - 3))
+        candles = store.get_candles()
+        assert store.indicators.atr_14 == _reference_atr(candles, period=14)
+        assert store.indicators.rsi_7 == _reference_rsi(candles, period=7)
+
     def test_vwap_computed(self):
         store = MarketDataStore("TEST")
         for i in range(5):
@@ -98,6 +137,20 @@ class TestMarketDataStore:
         assert store.indicators.high_15m > 0
         assert store.indicators.low_15m > 0
 
+    def test_range_last_n(self):
+        store = MarketDataStore("TEST")
+        assert store.range_last_n(3) == 0.0
+        store.add_candles(_rising_candles(10))
+        candles = store.get_candles(n=3)
+        assert store.range_last_n(3) == max(c.high for c in candles) - min(c.low for c in candles)
+
+    def test_avg_volume(self):
+        store = MarketDataStore("TEST")
+        assert store.avg_volume() == 0.0
+        assert store.avg_volume(default=100000) == 100000
+        store.add_candles(_candle(i, 100, 101, 99, 100, v=1000 * (i + 1)) for i in range(4))
+        assert store.avg_volume() == 2500
+
     def test_reset_session(self):
         store = MarketDataStore("TEST")
         for i in range(5):
@@ -128,6 +181,17 @@ class TestOptionDataStore:
         atr = store.premium_atr("CE", period=14)
         assert atr > 0
 
+    def test_premium_atr_refreshes_after_new_candle(self):
+        store = OptionDataStore()
+        for i in range(5):
+            ts = datetime(2025, 3, 10, 9, 15 + i)
+            store.add_pe_candle(PremiumCandle(timestamp=ts, open=50, high=52, low=48, close=50))
+        first = store.premium_atr("PE", period=14)
+        assert store.premium_atr("PE", period=14) == first
+        store.add_pe_candle(PremiumCandle(timestamp=datetime(2025, 3, 10, 9, 20),
+                                          open=50, high=62, low=48, close=60))
+        assert store.premium_atr("PE", period=14) > first
+
     def test_reset(self):
         store = OptionDataStore()
         ts = datetime(2025, 3, 10, 9, 15)
@@ -1,17 +1,14 @@
 """Unit tests for MetricsEngine — recording, daily report, KPIs."""
 
-import sys
-import os
-import tempfile
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import pytest
 
 from shared.metrics_engine import MetricsEngine, TradeMetrics
 
 
 class TestMetricsEngine:
-    def setup_method(self):
-        self.tmp_dir = tempfile.mkdtemp()
-        self.engine = MetricsEngine(data_dir=self.tmp_dir)
+    @pytest.fixture(autouse=True)
+    def _engine(self, tmp_path):
+        self.engine = MetricsEngine(data_dir=str(tmp_path))
 
     def _make_trade(self, trade_id: str, pnl: float, mfe: float = 0, mae: float = 0,
                     regime: str = "MID_TREND", profile: str = "P3_MID_TREND") -> TradeMetrics:
@@ -37,6 +34,15 @@ class TestMetricsEngine:
         self.engine.record_trade(self._make_trade("T-1", 500, mfe=700, mae=100))
         assert len(self.engine._trades) == 1
 
+    def test_record_trades_batch(self):
+        self.engine.record_trades([
+            self._make_trade("T-1", 500, mfe=700, mae=100),
+            self._make_trade("T-2", -200, mfe=50, mae=300),
+        ])
+        assert [t.trade_id for t in self.engine._trades] == ["T-1", "T-2"]
+        assert self.engine._trades[0].capture_ratio == round(500 / 700, 3)
+        assert self.engine._trades[1].capture_ratio == 0.0
+
     def test_record_filtered(self):
         self.engine.record_filtered("Low volume")
         self.engine.record_filtered("Low volume")
@@ -67,6 +73,19 @@ class TestMetricsEngine:
         assert "win_rate" in kpis
         assert kpis["win_rate"] > 0
 
+    def test_kpis_and_report_refresh_after_record(self):
+        self.engine.record_trade(self._make_trade("T-1", 500))
+        kpis = self.engine.compute_kpis()
+        report = self.engine.generate_daily_report("2025-03-10")
+        assert self.engine.generate_daily_report("2025-03-10") is report
+        kpis["total_trades"] = 99  # callers own their copy
+        assert self.engine.compute_kpis()["total_trades"] == 1
+
+        self.engine.record_trade(self._make_trade("T-2", -200))
+        assert self.engine.compute_kpis()["total_trades"] == 2
+        self.engine.record_filtered("Low volume")
+        assert self.engine.generate_daily_report("2025-03-10").filtered_reasons == {"Low volume": 1}
+
     def test_reset_daily(self):
         self.engine.record_filtered("test")
         self.engine.record_filtered("test2")
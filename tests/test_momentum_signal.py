@@ -1,54 +1,34 @@
 """Unit tests for MomentumSignalEngine — scoring, filtering, breakout confirmation."""
 
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
-from datetime import datetime
+from dataclasses import replace
+from datetime import datetime, timedelta
 from shared.momentum_signal import (
-    MomentumSignalEngine, MomentumConfig, SignalDirection,
+    DEFAULT_MOMENTUM_CONFIG, MomentumSignalEngine, MomentumConfig, SignalDirection,
 )
 from shared.market_data_store import Candle, DerivedIndicators
 
 
 def _candle(minute: int, o: float, h: float, lo: float, c: float, v: int = 100000) -> Candle:
-    ts = datetime(2025, 3, 10, 9, 15 + minute)
+    ts = datetime(2025, 3, 10, 9, 15) + timedelta(minutes=minute)
     return Candle(timestamp=ts, open=o, high=h, low=lo, close=c, volume=v)
 
 
-def _make_indicators(
-    spot: float = 23000,
-    or_high: float = 23050,
-    or_low: float = 22950,
-    ema_9: float = 22980,
-    ema_slope: float = 2.0,
-    vwap: float = 22970,
-    vwap_slope: float = 1.5,
-    atr_14: float = 20,
-    rsi_7: float = 60,
-    high_15m: float = 23060,
-    low_15m: float = 22940,
-) -> DerivedIndicators:
-    ind = DerivedIndicators()
-    ind.spot = spot
-    ind.or_high = or_high
-    ind.or_low = or_low
-    ind.or_locked = True
-    ind.ema_9 = ema_9
-    ind.ema_slope = ema_slope
-    ind.vwap = vwap
-    ind.vwap_slope = vwap_slope
-    ind.atr_14 = atr_14
-    ind.rsi_7 = rsi_7
-    ind.high_15m = high_15m
-    ind.low_15m = low_15m
-    return ind
+# Baseline snapshot: OR locked around 23000 with a mild bullish bias
+_IND_TEMPLATE = DerivedIndicators(
+    spot=23000, or_high=23050, or_low=22950, or_locked=True,
+    ema_9=22980, ema_slope=2.0, vwap=22970, vwap_slope=1.5,
+    atr_14=20, rsi_7=60, high_15m=23060, low_15m=22940,
+)
+
+
+def _make_indicators(**overrides) -> DerivedIndicators:
+    return replace(_IND_TEMPLATE, **overrides)
 
 
 class TestMomentumSignalEngine:
     def setup_method(self):
         self.engine = MomentumSignalEngine()
-        self.config = MomentumConfig()
+        self.config = DEFAULT_MOMENTUM_CONFIG
 
     def _make_candles(self, n: int = 20, base: float = 23000, trend: float = 1.0) -> list:
         candles = []
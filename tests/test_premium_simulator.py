@@ -1,9 +1,5 @@
 """Unit tests for PremiumSimulator — Greeks, tick, spread model."""
 
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
 from shared.premium_simulator import PremiumSimulator
 
 
@@ -75,6 +71,14 @@ class TestPremiumSimulator:
         sim.tick(new_spot=23000, elapsed_seconds=60, is_chop=True)
         assert sim.iv < initial_iv
 
+    def test_tick_batch_matches_ticks(self):
+        spots = [23010, 23025, 23015, 22990]
+        one = PremiumSimulator(spot=23000, strike=23000, option_type="CE", days_to_expiry=3.0)
+        batch = PremiumSimulator(spot=23000, strike=23000, option_type="CE", days_to_expiry=3.0)
+        expected = [one.tick(s, elapsed_seconds=60, is_chop=i % 2 == 1) for i, s in enumerate(spots)]
+        assert batch.tick_batch(spots, 60, is_chop=[False, True, False, True]) == expected
+        assert batch.iv == one.iv
+
     def test_greeks_structure(self):
         sim = PremiumSimulator(spot=23000, strike=23000, option_type="CE", days_to_expiry=3.0)
         g = sim.greeks
@@ -1,9 +1,5 @@
 """Unit tests for RegimeEngine — classification, time gates, chop detection."""
 
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
 from shared.regime_engine import RegimeEngine, Regime
 
 
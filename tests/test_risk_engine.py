@@ -1,28 +1,61 @@
 """Unit tests for RiskEngine — SL/TP computation, trailing, momentum failure."""
 
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import pytest
 
 from shared.risk_engine import (
-    RiskEngine, RiskConfig, RiskMode, ExitReason,
+    PortfolioRiskState, RiskEngine, RiskConfig, RiskMode, ExitReason,
 )
 
 
+_OPT_CFG = RiskConfig(
+    mode=RiskMode.PREMIUM_PCT,
+    sl_pct=0.10,
+    tp1_pct=0.12,
+    tp1_book_pct=0.60,
+    runner_trail_pct_min=0.06,
+    max_trades_per_day=8,
+    daily_loss_cap_pct=0.02,
+    consecutive_loss_limit=3,
+    cooldown_seconds=1800,
+)
+
+
+def _rewind(engine: RiskEngine) -> RiskEngine:
+    """Return a class-shared engine to a fresh trading day with no open trades."""
+    engine.portfolio_state = PortfolioRiskState()
+    engine._trade_states.clear()
+    engine.reset_daily(100000, "2025-03-10")
+    return engine
+
+
+@pytest.fixture(scope="class")
+def option_engine():
+    return RiskEngine(_OPT_CFG)
+
+
+@pytest.fixture(scope="class")
+def equity_engine():
+    return RiskEngine(RiskConfig(
+        mode=RiskMode.EQUITY_ATR,
+        equity_sl_atr_mult=1.0,
+        equity_tp1_atr_mult=1.2,
+        tp1_book_pct=0.55,
+        equity_runner_atr_mult=1.0,
+        equity_late_tighten_mult=0.8,
+        max_trades_per_day=10,
+        daily_loss_cap_pct=0.02,
+    ))
+
+
+@pytest.fixture(scope="class")
+def portfolio_engine():
+    return RiskEngine(_OPT_CFG)  # portfolio caps match the option config
+
+
 class TestRiskEngineOption:
-    def setup_method(self):
-        self.engine = RiskEngine(RiskConfig(
-            mode=RiskMode.PREMIUM_PCT,
-            sl_pct=0.10,
-            tp1_pct=0.12,
-            tp1_book_pct=0.60,
-            runner_trail_pct_min=0.06,
-            max_trades_per_day=8,
-            daily_loss_cap_pct=0.02,
-            consecutive_loss_limit=3,
-            cooldown_seconds=1800,
-        ))
-        self.engine.reset_daily(100000, "2025-03-10")
+    @pytest.fixture(autouse=True)
+    def _engine(self, option_engine):
+        self.engine = _rewind(option_engine)
 
     def test_init_option_trade(self):
         """Initializing an option trade computes SL/TP1."""
@@ -42,30 +75,42 @@ class TestRiskEngineOption:
         assert result["tp1_book_qty"] > 0
         assert result["runner_qty"] > 0
 
-    def test_sl_hit(self):
-        """Premium drops to SL → exit."""
-        self.engine.init_option_trade("OPT-002", 100.0, 5.0, 325, True)
-        reason = self.engine.update_tick("OPT-002", 89.0, 5.0, 1)
-        assert reason == ExitReason.SL_HIT
-
-    def test_tp1_hit(self):
-        """Premium rises to TP1 → TP1 partial book."""
-        self.engine.init_option_trade("OPT-003", 100.0, 5.0, 325, True)
-        reason = self.engine.update_tick("OPT-003", 113.0, 5.0, 1)
+    @pytest.mark.parametrize("ticks,expected,mfe,mae", [
+        ([(89.0, 5.0, 1)], ExitReason.SL_HIT, 0.0, 11.0),          # premium drops to SL
+        ([(113.0, 5.0, 1)], ExitReason.TP1_HIT, 13.0, 0.0),        # TP1 partial book
+        ([(105.0, 5.0, 1), (97.0, 5.0, 2)], None, 5.0, 3.0),       # MFE 105-100, MAE 100-97
+    ])
+    def test_exit_scenarios(self, ticks, expected, mfe, mae):
+        """Replay ticks on a fresh trade — exit reason and MFE/MAE."""
+        self.engine.init_option_trade("OPT-X", 100.0, 5.0, 325, True)
+        for tick in ticks:
+            reason = self.engine.update_tick("OPT-X", *tick)
+        assert reason == expected
+        state = self.engine.get_trade_state("OPT-X")
+        assert (state.mfe, state.mae) == (mfe, mae)
+
+    def test_mfe_mae_batch_matches_per_tick(self):
+        """update_ticks folds MFE/MAE exactly like repeated update_tick calls."""
+        prices = [103.0, 97.5, 108.25, 94.0, 101.0]
+        self.engine.init_option_trade("OPT-007", 100.0, 5.0, 325, True)
+        self.engine.init_option_trade("OPT-008", 100.0, 5.0, 325, True)
+        for idx, price in enumerate(prices, 1):
+            assert self.engine.update_tick("OPT-007", price, 5.0, 0.0, idx) is None
+        assert self.engine.update_ticks("OPT-008", prices, range(1, 6), 5.0) is None
+        one = self.engine.get_trade_state("OPT-007")
+        batch = self.engine.get_trade_state("OPT-008")
+        assert (batch.mfe, batch.mae) == (one.mfe, one.mae) == (8.25, 6.0)
+        assert batch.candles_since_new_high == one.candles_since_new_high
+
+    def test_update_ticks_stops_at_first_exit(self):
+        """Batch replay returns the first exit and leaves later ticks unapplied."""
+        self.engine.init_option_trade("OPT-006", 100.0, 5.0, 325, True)
+        reason = self.engine.update_ticks("OPT-006", [105.0, 113.0, 89.0], range(1, 4), 5.0)
         assert reason == ExitReason.TP1_HIT
-
-    def test_mfe_mae_tracking(self):
-        """MFE and MAE update correctly."""
-        self.engine.init_option_trade("OPT-004", 100.0, 5.0, 325, True)
-        self.engine.update_tick("OPT-004", 105.0, 5.0, 1)
-        state = self.engine.get_trade_state("OPT-004")
-        assert state is not None
-        assert state.mfe == 5.0  # 105 - 100
+        state = self.engine.get_trade_state("OPT-006")
+        assert state.mfe == 13.0
         assert state.mae == 0.0
-
-        self.engine.update_tick("OPT-004", 97.0, 5.0, 2)
-        state = self.engine.get_trade_state("OPT-004")
-        assert state.mae == 3.0  # 100 - 97
+        assert self.engine.update_ticks("MISSING", [1.0], [1]) is None
 
     def test_trailing_after_tp1(self):
         """After TP1 hit, SL should trail higher."""
@@ -79,18 +124,9 @@ class TestRiskEngineOption:
 
 
 class TestRiskEngineEquity:
-    def setup_method(self):
-        self.engine = RiskEngine(RiskConfig(
-            mode=RiskMode.EQUITY_ATR,
-            equity_sl_atr_mult=1.0,
-            equity_tp1_atr_mult=1.2,
-            tp1_book_pct=0.55,
-            equity_runner_atr_mult=1.0,
-            equity_late_tighten_mult=0.8,
-            max_trades_per_day=10,
-            daily_loss_cap_pct=0.02,
-        ))
-        self.engine.reset_daily(100000, "2025-03-10")
+    @pytest.fixture(autouse=True)
+    def _engine(self, equity_engine):
+        self.engine = _rewind(equity_engine)
 
     def test_init_equity_trade(self):
         """Equity ATR-based SL/TP."""
@@ -111,15 +147,9 @@ class TestRiskEngineEquity:
 
 
 class TestRiskEnginePortfolio:
-    def setup_method(self):
-        self.engine = RiskEngine(RiskConfig(
-            mode=RiskMode.PREMIUM_PCT,
-            daily_loss_cap_pct=0.02,
-            consecutive_loss_limit=3,
-            cooldown_seconds=1800,
-            max_trades_per_day=8,
-        ))
-        self.engine.reset_daily(100000, "2025-03-10")
+    @pytest.fixture(autouse=True)
+    def _engine(self, portfolio_engine):
+        self.engine = _rewind(portfolio_engine)
 
     def test_can_trade_initially(self):
         can, reason = self.engine.check_can_trade(is_option=True)
@@ -8,10 +8,7 @@ Tests 4 canonical intraday scenarios:
   4. IV Spike Day — event spike → filters + premium simulation
 """
 
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
+from dataclasses import replace
 from datetime import datetime
 from shared.market_data_store import MarketDataStore, Candle
 from shared.regime_engine import RegimeEngine, Regime
@@ -20,7 +17,9 @@ from shared.risk_engine import RiskEngine, RiskConfig, RiskMode, ExitReason
 from shared.self_learning import SelfLearningEngine
 from shared.metrics_engine import MetricsEngine, TradeMetrics
 from shared.premium_simulator import PremiumSimulator
-import tempfile
+
+
+_OPT_CFG = RiskConfig(mode=RiskMode.PREMIUM_PCT, sl_pct=0.10, tp1_pct=0.12, tp1_book_pct=0.60)
 
 
 def _candle(hour: int, minute: int, o: float, h: float, lo: float, c: float, v: int = 150000) -> Candle:
@@ -42,34 +41,31 @@ class TestScenarioTrendDay:
         store = MarketDataStore("NIFTY")
         regime = RegimeEngine(atr_min_threshold=5.0)
         momentum = MomentumSignalEngine()
-        risk = RiskEngine(RiskConfig(
-            mode=RiskMode.PREMIUM_PCT,
-            sl_pct=0.10, tp1_pct=0.12,
-            tp1_book_pct=0.60,
-        ))
+        risk = RiskEngine(_OPT_CFG)
         risk.reset_daily(100000, "2025-03-10")
 
         # Phase 1: Opening range (9:15 - 9:30)
         base = 23000
-        for i in range(15):
-            price = base + (i - 7) * 2  # oscillate around 23000
-            store.add_candle(_candle(9, 15 + i, price, price + 5, price - 5, price, v=200000))
+        prices = [base + (i - 7) * 2 for i in range(15)]  # oscillate around 23000
+        store.add_candles([
+            _candle(9, 15 + i, p, p + 5, p - 5, p, v=200000) for i, p in enumerate(prices)
+        ])
 
         ind = store.indicators
         assert ind.or_high > 0
         assert ind.or_low > 0
 
         # Phase 2: Breakout (9:30 - 9:45)
-        for i in range(15):
-            price = 23030 + i * 3  # steadily rising past OR high
-            store.add_candle(_candle(9, 30 + i, price, price + 4, price - 2, price + 2, v=300000))
+        store.add_candles([
+            _candle(9, 30 + i, p, p + 4, p - 2, p + 2, v=300000)
+            for i, p in enumerate(range(23030, 23075, 3))  # steadily rising past OR high
+        ])
 
         ind = store.indicators
         minute_of_day = 9 * 60 + 45
 
         # Classify regime
-        candles_3 = store.get_candles(n=3)
-        range_3 = max(c.high for c in candles_3) - min(c.low for c in candles_3)
+        range_3 = store.range_last_n(3)
         regime_result = regime.classify(
             spot=ind.spot, vwap=ind.vwap, vwap_slope=ind.vwap_slope,
             atr=ind.atr_14, minute_of_day=minute_of_day, range_last_3=range_3,
@@ -79,7 +75,7 @@ class TestScenarioTrendDay:
 
         # Evaluate momentum with confirm_candles=1 for single-call test
         all_candles = store.get_candles()
-        avg_vol = sum(c.volume for c in all_candles) / len(all_candles)
+        avg_vol = store.avg_volume()
         config = MomentumConfig(confirm_candles=1)
         signal = momentum.evaluate(
             ind=ind, candles=all_candles, config=config, volume_avg=avg_vol, is_option=False,
@@ -112,13 +108,13 @@ class TestScenarioRangeDay:
         momentum = MomentumSignalEngine()
 
         # Choppy candles within tight range
-        for i in range(30):
-            price = 23000 + (i % 5 - 2) * 2  # oscillate ±4 pts
-            store.add_candle(_candle(9, 15 + i, price, price + 3, price - 3, price, v=80000))
+        prices = [23000 + (i % 5 - 2) * 2 for i in range(30)]  # oscillate ±4 pts
+        store.add_candles([
+            _candle(9, 15 + i, p, p + 3, p - 3, p, v=80000) for i, p in enumerate(prices)
+        ])
 
         ind = store.indicators
-        candles_3 = store.get_candles(n=3)
-        range_3 = max(c.high for c in candles_3) - min(c.low for c in candles_3)
+        range_3 = store.range_last_n(3)
 
         # Regime: classify (may or may not detect chop depending on vwap proximity)
         regime_result = regime.classify(
@@ -134,7 +130,7 @@ class TestScenarioRangeDay:
 
         # Momentum: signal should be filtered or very low confidence
         all_candles = store.get_candles()
-        avg_vol = sum(c.volume for c in all_candles) / len(all_candles)
+        avg_vol = store.avg_volume()
         config = MomentumConfig(confirm_candles=1)
         signal = momentum.evaluate(
             ind=ind, candles=all_candles, config=config, volume_avg=avg_vol, is_option=False,
@@ -154,16 +150,11 @@ class TestScenarioFakeBreakout:
 
     def test_fake_breakout_exit(self):
         store = MarketDataStore("NIFTY")
-        risk = RiskEngine(RiskConfig(
-            mode=RiskMode.PREMIUM_PCT,
-            sl_pct=0.10, tp1_pct=0.12,
-            mf_candles_stagnant=3,
-        ))
+        risk = RiskEngine(replace(_OPT_CFG, mf_candles_stagnant=3))
         risk.reset_daily(100000, "2025-03-10")
 
         # Build OR
-        for i in range(15):
-            store.add_candle(_candle(9, 15 + i, 23000, 23010, 22990, 23000))
+        store.add_candles([_candle(9, 15 + i, 23000, 23010, 22990, 23000) for i in range(15)])
 
         # Fake breakout: price goes above then comes back
         risk.init_option_trade("FAKE-001", 100.0, 5.0, 325, True)
@@ -173,13 +164,12 @@ class TestScenarioFakeBreakout:
         assert reason is None
 
         # Premium stalls for 3+ candles (stagnation) + spot back in breakout zone
-        for idx in range(17, 21):
-            reason = risk.update_tick(
-                "FAKE-001", 101.0, premium_atr=5.0, candle_idx=idx,
-                spot_in_breakout_zone=True,
-                vwap_recrossed=True,
-                volume_ratio=0.6,
-            )
+        reason = risk.update_ticks(
+            "FAKE-001", [101.0] * 4, range(17, 21), premium_atr=5.0,
+            spot_in_breakout_zone=True,
+            vwap_recrossed=True,
+            volume_ratio=0.6,
+        )
         # Should eventually trigger momentum failure
         # (may or may not depending on stagnation threshold implementation)
         # The test validates the pipeline doesn't crash
@@ -219,23 +209,13 @@ class TestScenarioIVSpike:
         """Simulate 30 ticks of premium movement."""
         sim = PremiumSimulator(spot=23000, strike=23000, option_type="CE",
                               days_to_expiry=3.0, iv=15.0)
-        premiums = [sim.premium]
-        spot = 23000
-
-        # Simulate trending up for 15 ticks, then reversal
-        for i in range(30):
-            if i < 15:
-                spot += 5  # trending up
-                is_breakout = True
-                is_chop = False
-            else:
-                spot -= 3  # mild reversal
-                is_breakout = False
-                is_chop = True
-
-            sim.tick(new_spot=spot, elapsed_seconds=60,
-                    is_breakout=is_breakout, is_chop=is_chop)
-            premiums.append(sim.premium)
+        # Trending up for 15 ticks, then reversal
+        spots = [23000 + 5 * i for i in range(1, 16)] + [23075 - 3 * i for i in range(1, 16)]
+        trending = [True] * 15 + [False] * 15
+        premiums = [sim.premium] + sim.tick_batch(
+            spots, elapsed_seconds=60,
+            is_breakout=trending, is_chop=[not t for t in trending],
+        )
 
         # Premium should have risen during uptrend
         peak = max(premiums[:16])
@@ -247,29 +227,35 @@ class TestScenarioIVSpike:
 class TestIntegrationLearningMetrics:
     """Integration test: Learning + Metrics engines work together."""
 
-    def test_record_and_learn(self):
-        tmp = tempfile.mkdtemp()
+    def test_record_and_learn(self, tmp_path):
+        tmp = str(tmp_path)
         metrics = MetricsEngine(data_dir=tmp)
         learning = SelfLearningEngine(data_dir=tmp)
 
-        # Simulate 5 trades, selecting profile + recording result each time
+        # Simulate 5 trades, selecting profile + recording results as one batch
         profile = "P3_MID_TREND"
-        for i in range(5):
-            pnl = 300 if i % 2 == 0 else -150
-            regime = "MID_TREND" if i % 2 == 0 else "MID_CHOP"
+        outcomes = [
+            (300, "MID_TREND") if i % 2 == 0 else (-150, "MID_CHOP") for i in range(5)
+        ]
 
-            # Select profile (UCB-based) to increment counters
+        # Select profile (UCB-based) to increment counters
+        for _ in outcomes:
             learning.select_profile()
 
-            metrics.record_trade(TradeMetrics(
+        metrics.record_trades([
+            TradeMetrics(
                 trade_id=f"INT-{i}", regime=regime, profile_id=profile,
                 breakout_level=23050, entry_mode="BREAKOUT_CONFIRM",
                 pnl=pnl, pnl_pct=pnl / 100, mfe=abs(pnl) * 1.2,
                 mae=abs(pnl) * 0.3, spread_cost=5, slippage_cost=3,
                 entry_time="2025-03-10T10:00:00", exit_time="2025-03-10T10:30:00",
                 hold_seconds=1800, exit_reason="TP1_HIT" if pnl > 0 else "SL_HIT",
-            ))
-            learning.record_trade_result(profile, pnl, abs(pnl) * 0.3, regime)
+            )
+            for i, (pnl, regime) in enumerate(outcomes)
+        ])
+        learning.record_trade_results(
+            (profile, pnl, abs(pnl) * 0.3, regime) for pnl, regime in outcomes
+        )
 
         # Metrics report
         report = metrics.generate_daily_report("2025-03-10")
@@ -1,12 +1,41 @@
 """Tests for services/ai_model_service/schemas.py — Pydantic schema validations."""
 import pytest
 from pydantic import ValidationError
+
 from services.ai_model_service.schemas import (
+    ConsensusOutput,
     SentimentAnalysisOutput,
     TradeRationaleOutput,
-    ConsensusOutput,
 )
 
+_SENTIMENT_KWARGS = {
+    "symbol": "TCS",
+    "sentiment_score": 0.5,
+    "subjectivity_score": 0.5,
+    "key_drivers": [],
+    "confidence": 0.5,
+}
+
+_RATIONALE_KWARGS = {
+    "symbol": "INFY",
+    "bias": "NEUTRAL",
+    "technical_observations": [],
+    "fundamental_highlights": [],
+    "risk_factors": [],
+    "conviction_level": 0.5,
+}
+
+
+class TestFieldBounds:
+    @pytest.mark.parametrize("model_cls,base_kwargs,field,bad_value", [
+        (SentimentAnalysisOutput, _SENTIMENT_KWARGS, "sentiment_score", 1.5),  # must be in [-1, 1]
+        (SentimentAnalysisOutput, _SENTIMENT_KWARGS, "confidence", 2.0),
+        (TradeRationaleOutput, _RATIONALE_KWARGS, "conviction_level", 1.5),
+    ])
+    def test_bounds_rejected(self, model_cls, base_kwargs, field, bad_value):
+        with pytest.raises(ValidationError):
+            model_cls(**{**base_kwargs, field: bad_value})
+
 
 class TestSentimentAnalysisOutput:
     def test_valid_sentiment(self):
@@ -20,27 +49,6 @@ class TestSentimentAnalysisOutput:
         assert s.symbol == "RELIANCE"
         assert s.sentiment_score == 0.75
 
-    def test_sentiment_score_bounds(self):
-        # sentiment_score must be between -1.0 and 1.0
-        with pytest.raises(ValidationError):
-            SentimentAnalysisOutput(
-                symbol="TCS",
-                sentiment_score=1.5,  # out of range
-                subjectivity_score=0.5,
-                key_drivers=[],
-                confidence=0.5,
-            )
-
-    def test_confidence_bounds(self):
-        with pytest.raises(ValidationError):
-            SentimentAnalysisOutput(
-                symbol="TCS",
-                sentiment_score=0.5,
-                subjectivity_score=0.5,
-                key_drivers=[],
-                confidence=2.0,  # out of range
-            )
-
     def test_negative_sentiment(self):
         s = SentimentAnalysisOutput(
             symbol="ADANI",
@@ -75,17 +83,6 @@ class TestTradeRationaleOutput:
                 conviction_level=0.5,
             )
 
-    def test_conviction_bounds(self):
-        with pytest.raises(ValidationError):
-            TradeRationaleOutput(
-                symbol="INFY",
-                bias="NEUTRAL",
-                technical_observations=[],
-                fundamental_highlights=[],
-                risk_factors=[],
-                conviction_level=1.5,  # out of range
-            )
-
 
 class TestConsensusOutput:
     def test_valid_consensus(self):
@@ -1,17 +1,12 @@
 """Unit tests for SelfLearningEngine — profile selection, bandit, persistence."""
 
-import sys
-import os
-import tempfile
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
 from shared.self_learning import SelfLearningEngine
 
 
 class TestSelfLearningEngine:
     def setup_method(self):
-        self.tmp_dir = tempfile.mkdtemp()
-        self.engine = SelfLearningEngine(data_dir=self.tmp_dir)
+        # In-memory — only test_persistence touches disk
+        self.engine = SelfLearningEngine(data_dir=None)
 
     def test_default_profiles_loaded(self):
         profiles = self.engine.get_profiles()
@@ -60,14 +55,21 @@ class TestSelfLearningEngine:
         # Could be any un-explored profile
         assert profile.profile_id != ""
 
-    def test_persistence(self):
-        """Engine persists and reloads state."""
-        self.engine.select_profile("P1_OPEN_TREND")
+    def test_in_memory_engine_never_writes(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
         self.engine.record_trade_result("P1_OPEN_TREND", pnl=500, drawdown=100)
         self.engine._save()
+        assert list(tmp_path.iterdir()) == []
+
+    def test_persistence(self, tmp_path):
+        """Engine persists and reloads state."""
+        engine = SelfLearningEngine(data_dir=str(tmp_path))
+        engine.select_profile("P1_OPEN_TREND")
+        engine.record_trade_result("P1_OPEN_TREND", pnl=500, drawdown=100)
+        engine._save()
 
         # Create new engine from same dir
-        engine2 = SelfLearningEngine(data_dir=self.tmp_dir)
+        engine2 = SelfLearningEngine(data_dir=str(tmp_path))
         stats = engine2.get_bandit_stats()
         arm = next(a for a in stats["arms"] if a["profile_id"] == "P1_OPEN_TREND")
         assert arm["n_selections"] == 1
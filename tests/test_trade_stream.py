@@ -3,7 +3,9 @@ Integration tests for shared/trade_stream.py — Trade Message Streaming.
 Tests InMemoryTradeStream, TradeMessage serialization, and factory.
 """
 import asyncio
+import json
 import pytest
+import pytest_asyncio
 from shared.trade_stream import (
     TradeMessage,
     InMemoryTradeStream,
@@ -55,9 +57,10 @@ class TestTradeMessage:
             user_id="u2", user_email="b@c.com",
             action="CLOSE", symbol="TCS",
         )
-        j = msg.to_json()
-        assert '"action": "CLOSE"' in j
-        assert '"symbol": "TCS"' in j
+        j = json.loads(msg.to_json())
+        assert j["action"] == "CLOSE"
+        assert j["symbol"] == "TCS"
+        assert j["message_id"] == msg.message_id
 
     def test_from_dict_roundtrip(self):
         msg = TradeMessage(
@@ -92,19 +95,37 @@ class TestTradeMessage:
         assert msg.metadata == {}
 
 
+async def _until(predicate):
+    while not predicate():
+        await asyncio.sleep(0)
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def shared_stream():
+    """One running stream for the module; tests subscribe late and are reset after."""
+    s = InMemoryTradeStream()
+    await s.start()
+    yield s
+    await s.stop()
+
+
+@pytest_asyncio.fixture(loop_scope="module")
+async def stream(shared_stream):
+    yield shared_stream
+    await shared_stream.clear_subscribers()
+
+
+@pytest.mark.asyncio(loop_scope="module")
 class TestInMemoryTradeStream:
     """Test in-memory pub/sub stream."""
 
-    @pytest.mark.asyncio
-    async def test_publish_and_consume(self):
-        stream = InMemoryTradeStream()
+    async def test_publish_and_consume(self, stream):
         received = []
 
         async def handler(msg):
             received.append(msg)
 
         stream.subscribe(TOPIC_TRADE_REQUEST, handler)
-        await stream.start()
 
         msg = TradeMessage(
             user_id="u10", user_email="x@y.com",
@@ -113,24 +134,19 @@ class TestInMemoryTradeStream:
         )
         await stream.publish(TOPIC_TRADE_REQUEST, msg)
 
-        # Give consumer time to process
-        await asyncio.sleep(0.3)
-        await stream.stop()
+        await stream.drain()
 
         assert len(received) == 1
         assert received[0].symbol == "RELIANCE"
         assert received[0].user_id == "u10"
 
-    @pytest.mark.asyncio
-    async def test_multiple_messages(self):
-        stream = InMemoryTradeStream()
+    async def test_multiple_messages(self, stream):
         received = []
 
         async def handler(msg):
             received.append(msg)
 
         stream.subscribe(TOPIC_TRADE_STATUS, handler)
-        await stream.start()
 
         for i in range(5):
             msg = TradeMessage(
@@ -139,14 +155,30 @@ class TestInMemoryTradeStream:
             )
             await stream.publish(TOPIC_TRADE_STATUS, msg)
 
-        await asyncio.sleep(0.5)
-        await stream.stop()
+        await stream.drain()
 
-        assert len(received) == 5
+        assert [m.symbol for m in received] == [f"SYM{i}" for i in range(5)]
 
-    @pytest.mark.asyncio
-    async def test_multiple_topics(self):
-        stream = InMemoryTradeStream()
+    async def test_slow_subscriber_does_not_block_others(self, stream):
+        fast = []
+        gate = asyncio.Event()
+
+        async def slow_handler(msg):
+            await gate.wait()
+
+        async def fast_handler(msg):
+            fast.append(msg.symbol)
+
+        stream.subscribe(TOPIC_TRADE_STATUS, slow_handler)
+        stream.subscribe(TOPIC_TRADE_STATUS, fast_handler)
+        await stream.publish(TOPIC_TRADE_STATUS, TradeMessage("u1", "a@b.com", "PLACE", "ITC"))
+
+        await asyncio.wait_for(_until(lambda: fast), timeout=1.0)
+        assert fast == ["ITC"]
+        gate.set()
+        await stream.drain()
+
+    async def test_multiple_topics(self, stream):
         trade_msgs = []
         sl_msgs = []
 
@@ -158,7 +190,6 @@ class TestInMemoryTradeStream:
 
         stream.subscribe(TOPIC_TRADE_REQUEST, trade_handler)
         stream.subscribe(TOPIC_TRAILING_SL, sl_handler)
-        await stream.start()
 
         await stream.publish(
             TOPIC_TRADE_REQUEST,
@@ -169,36 +200,30 @@ class TestInMemoryTradeStream:
             TradeMessage("u1", "a@b.com", "MODIFY_SL", "NIFTY"),
         )
 
-        await asyncio.sleep(0.3)
-        await stream.stop()
+        await stream.drain()
 
         assert len(trade_msgs) == 1
         assert len(sl_msgs) == 1
         assert trade_msgs[0].action == "PLACE"
         assert sl_msgs[0].action == "MODIFY_SL"
 
-    @pytest.mark.asyncio
-    async def test_sync_handler(self):
-        stream = InMemoryTradeStream()
+    async def test_sync_handler(self, stream):
         received = []
 
         def sync_handler(msg):
             received.append(msg.symbol)
 
         stream.subscribe(TOPIC_TRADE_REQUEST, sync_handler)
-        await stream.start()
 
         await stream.publish(
             TOPIC_TRADE_REQUEST,
             TradeMessage("u1", "a@b.com", "PLACE", "TCS"),
         )
 
-        await asyncio.sleep(0.3)
-        await stream.stop()
+        await stream.drain()
 
         assert received == ["TCS"]
 
-    @pytest.mark.asyncio
     async def test_stop_prevents_further_consumption(self):
         stream = InMemoryTradeStream()
         received = []
@@ -214,8 +239,11 @@ class TestInMemoryTradeStream:
             TOPIC_TRADE_REQUEST,
             TradeMessage("u1", "a@b.com", "PLACE", "SBI"),
         )
-        await asyncio.sleep(0.2)
+        for _ in range(5):  # give any surviving consumer a chance to run
+            await asyncio.sleep(0)
 
+        (queue,) = stream._queues[TOPIC_TRADE_REQUEST]
+        assert queue.qsize() == 1  # still queued — no consumer took it
         assert len(received) == 0  # Nothing consumed after stop
 
 
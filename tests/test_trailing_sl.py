@@ -2,7 +2,10 @@
 Integration tests for shared/trailing_sl.py — Trailing Stop Loss Engine.
 Tests all 4 strategies: PERCENTAGE, ATR_BASED, STEP_TRAIL, HYBRID.
 """
+import pytest
+
 from shared.trailing_sl import (
+    HistoryEntry,
     TrailingStopLossEngine,
     TrailConfig,
     TrailState,
@@ -10,6 +13,12 @@ from shared.trailing_sl import (
 )
 
 
+@pytest.fixture
+def buy_state():
+    """Fresh long trade: entry 100, SL 95 — compute_new_sl mutates it."""
+    return TrailingStopLossEngine.create_state("T", "BUY", 100.0, 95.0)
+
+
 class TestTrailStateCreation:
     """Test factory and serialization helpers."""
 
@@ -35,6 +44,7 @@ class TestTrailStateCreation:
         )
         assert state.trade_type == "SELL"
         assert state.current_sl == 210.0
+        assert state.direction == -1
 
     def test_state_roundtrip_serialization(self):
         state = TrailingStopLossEngine.create_state(
@@ -48,13 +58,27 @@ class TestTrailStateCreation:
         assert restored.current_sl == state.current_sl
         assert restored.peak_price == state.peak_price
 
+    def test_state_bytes_roundtrip(self):
+        state = TrailingStopLossEngine.create_state(
+            trade_id="T005", trade_type="SELL",
+            entry_price=200.0, stop_loss=210.0,
+        )
+        cfg = TrailConfig(strategy=TrailStrategy.PERCENTAGE)
+        TrailingStopLossEngine.compute_new_sl(state, 196.0, cfg)
+        data = TrailingStopLossEngine.state_to_bytes(state)
+        assert isinstance(data, bytes)
+        restored = TrailingStopLossEngine.state_from_bytes(data)
+        assert restored == state
+        assert restored.history[0].new_sl == state.current_sl
+
     def test_state_to_dict_caps_history(self):
         state = TrailingStopLossEngine.create_state(
             "T004", "BUY", 100.0, 95.0,
         )
-        state.history = [{"old_sl": i, "new_sl": i + 1} for i in range(30)]
+        state.history.extend(HistoryEntry(i, i + 1, 100.0, 1.0, 0) for i in range(30))
+        assert len(state.history) == 20  # oldest dropped on append
         d = TrailingStopLossEngine.state_to_dict(state)
-        assert len(d["history"]) == 20  # capped at 20
+        assert [h["old_sl"] for h in d["history"]] == list(range(10, 30))
 
 
 class TestPercentageTrail:
@@ -63,38 +87,31 @@ class TestPercentageTrail:
     def _config(self, **kw):
         return TrailConfig(strategy=TrailStrategy.PERCENTAGE, **kw)
 
-    def test_no_trail_when_no_profit(self):
-        state = TrailingStopLossEngine.create_state("P1", "BUY", 100.0, 95.0)
-        cfg = self._config()
-        result = TrailingStopLossEngine.compute_new_sl(state, 99.0, cfg)
-        assert result is None  # price below entry — no trailing
-
-    def test_no_trail_below_activation(self):
-        state = TrailingStopLossEngine.create_state("P2", "BUY", 100.0, 95.0)
-        cfg = self._config(activation_pct=0.5)
-        # 0.2% profit — below activation threshold
-        result = TrailingStopLossEngine.compute_new_sl(state, 100.2, cfg)
-        assert result is None
+    @pytest.mark.parametrize("price,activation_pct", [
+        (99.0, 0.3),   # price below entry — no trailing
+        (100.2, 0.5),  # 0.2% profit — below activation threshold
+    ])
+    def test_no_trail_before_activation(self, buy_state, price, activation_pct):
+        cfg = self._config(activation_pct=activation_pct)
+        assert TrailingStopLossEngine.compute_new_sl(buy_state, price, cfg) is None
 
-    def test_trail_activates_on_sufficient_profit(self):
-        state = TrailingStopLossEngine.create_state("P3", "BUY", 100.0, 95.0)
+    def test_trail_activates_on_sufficient_profit(self, buy_state):
         cfg = self._config(activation_pct=0.3, trail_pct=0.5)
         # 1% profit → triggers trail
-        new_sl = TrailingStopLossEngine.compute_new_sl(state, 101.0, cfg)
+        new_sl = TrailingStopLossEngine.compute_new_sl(buy_state, 101.0, cfg)
         assert new_sl is not None
         assert new_sl > 95.0  # SL tightened
         assert new_sl < 101.0  # SL below current price
 
-    def test_sl_only_tightens_long(self):
+    def test_sl_only_tightens_long(self, buy_state):
         """SL must only move up for BUY trades, never widen."""
-        state = TrailingStopLossEngine.create_state("P4", "BUY", 100.0, 95.0)
         cfg = self._config(activation_pct=0.3, trail_pct=0.5)
 
         # Move up
-        sl1 = TrailingStopLossEngine.compute_new_sl(state, 102.0, cfg)
+        sl1 = TrailingStopLossEngine.compute_new_sl(buy_state, 102.0, cfg)
         assert sl1 is not None
         # Price drops (SL should not widen)
-        sl2 = TrailingStopLossEngine.compute_new_sl(state, 101.0, cfg)
+        sl2 = TrailingStopLossEngine.compute_new_sl(buy_state, 101.0, cfg)
         assert sl2 is None  # No widening
 
     def test_short_trade_trail(self):
@@ -106,10 +123,9 @@ class TestPercentageTrail:
         assert new_sl < 210.0  # SL tightened (moved down)
         assert new_sl > 197.0  # SL above current price
 
-    def test_invalid_price_returns_none(self):
-        state = TrailingStopLossEngine.create_state("P6", "BUY", 100.0, 95.0)
-        assert TrailingStopLossEngine.compute_new_sl(state, 0, TrailConfig()) is None
-        assert TrailingStopLossEngine.compute_new_sl(state, -5, TrailConfig()) is None
+    @pytest.mark.parametrize("price", [0, -5])
+    def test_invalid_price_returns_none(self, buy_state, price):
+        assert TrailingStopLossEngine.compute_new_sl(buy_state, price, TrailConfig()) is None
 
 
 class TestATRTrail:
@@ -118,26 +134,16 @@ class TestATRTrail:
     def _config(self, **kw):
         return TrailConfig(strategy=TrailStrategy.ATR_BASED, **kw)
 
-    def test_atr_trail_long(self):
-        state = TrailingStopLossEngine.create_state("A1", "BUY", 100.0, 95.0)
-        cfg = self._config(atr_multiplier=1.5)
-        # ATR = 2.0, so trail distance = 3.0
-        new_sl = TrailingStopLossEngine.compute_new_sl(state, 105.0, cfg, atr=2.0)
-        assert new_sl is not None
-        assert new_sl > 95.0
-
-    def test_atr_none_falls_back_to_percentage(self):
-        state = TrailingStopLossEngine.create_state("A2", "BUY", 100.0, 95.0)
-        cfg = self._config(activation_pct=0.3, trail_pct=0.5)
-        # No ATR provided → falls back to percentage
-        new_sl = TrailingStopLossEngine.compute_new_sl(state, 102.0, cfg, atr=None)
-        assert new_sl is not None
+    def test_atr_trail_long(self, buy_state):
+        cfg = self._config(atr_multiplier=1.5, activation_pct=0.3, trail_pct=0.5)
+        # Trail distance = 1.5 x 2.0 below the 105 peak
+        assert TrailingStopLossEngine.compute_new_sl(buy_state, 105.0, cfg, atr=2.0) == 102.0
 
-    def test_atr_zero_falls_back(self):
-        state = TrailingStopLossEngine.create_state("A3", "BUY", 100.0, 95.0)
-        cfg = self._config(activation_pct=0.3, trail_pct=0.5)
-        new_sl = TrailingStopLossEngine.compute_new_sl(state, 102.0, cfg, atr=0)
-        assert new_sl is not None
+    @pytest.mark.parametrize("atr", [None, 0])
+    def test_missing_atr_falls_back_to_percentage(self, buy_state, atr):
+        cfg = self._config(atr_multiplier=1.5, activation_pct=0.3, trail_pct=0.5)
+        # Percentage trail: 0.5% below the 102 peak
+        assert TrailingStopLossEngine.compute_new_sl(buy_state, 102.0, cfg, atr=atr) == 101.49
 
 
 class TestStepTrail:
@@ -146,29 +152,27 @@ class TestStepTrail:
     def _config(self, **kw):
         return TrailConfig(strategy=TrailStrategy.STEP_TRAIL, **kw)
 
-    def test_step_trail_progression(self):
-        state = TrailingStopLossEngine.create_state("S1", "BUY", 100.0, 95.0)
+    def test_step_trail_progression(self, buy_state):
         cfg = self._config(step_size_pct=0.5, step_lock_pct=0.3)
 
         # 0.6% profit → step 1 reached
-        sl1 = TrailingStopLossEngine.compute_new_sl(state, 100.6, cfg)
+        sl1 = TrailingStopLossEngine.compute_new_sl(buy_state, 100.6, cfg)
         assert sl1 is not None
-        assert state.step_level == 1
+        assert buy_state.step_level == 1
 
         # 1.1% profit → step 2 reached
-        sl2 = TrailingStopLossEngine.compute_new_sl(state, 101.1, cfg)
+        sl2 = TrailingStopLossEngine.compute_new_sl(buy_state, 101.1, cfg)
         assert sl2 is not None
         assert sl2 > sl1
-        assert state.step_level == 2
+        assert buy_state.step_level == 2
 
-    def test_step_trail_no_move_within_same_step(self):
-        state = TrailingStopLossEngine.create_state("S2", "BUY", 100.0, 95.0)
+    def test_step_trail_no_move_within_same_step(self, buy_state):
         cfg = self._config(step_size_pct=1.0, step_lock_pct=0.5)
         # 1.2% profit → step 1
-        sl1 = TrailingStopLossEngine.compute_new_sl(state, 101.2, cfg)
+        sl1 = TrailingStopLossEngine.compute_new_sl(buy_state, 101.2, cfg)
         assert sl1 is not None
         # 1.5% profit → still step 1 — no new SL
-        sl2 = TrailingStopLossEngine.compute_new_sl(state, 101.5, cfg)
+        sl2 = TrailingStopLossEngine.compute_new_sl(buy_state, 101.5, cfg)
         assert sl2 is None  # Same step level
 
 
@@ -178,55 +182,81 @@ class TestHybridTrail:
     def _config(self, **kw):
         return TrailConfig(strategy=TrailStrategy.HYBRID, **kw)
 
-    def test_breakeven_phase(self):
-        state = TrailingStopLossEngine.create_state("H1", "BUY", 100.0, 95.0)
+    def test_breakeven_phase(self, buy_state):
         cfg = self._config(
             breakeven_trigger_pct=0.5,
             breakeven_buffer_pct=0.05,
         )
         # 0.6% profit → breakeven triggered
-        new_sl = TrailingStopLossEngine.compute_new_sl(state, 100.6, cfg)
+        new_sl = TrailingStopLossEngine.compute_new_sl(buy_state, 100.6, cfg)
         assert new_sl is not None
-        assert state.breakeven_set is True
+        assert buy_state.breakeven_set is True
         # SL should be very close to entry + buffer
         assert abs(new_sl - 100.05) < 0.1
 
-    def test_hybrid_step_phase(self):
-        state = TrailingStopLossEngine.create_state("H2", "BUY", 100.0, 95.0)
+    def test_hybrid_step_phase(self, buy_state):
         cfg = self._config(
             breakeven_trigger_pct=0.3,
             step_size_pct=0.5,
             step_lock_pct=0.3,
         )
         # Trigger breakeven first
-        TrailingStopLossEngine.compute_new_sl(state, 100.5, cfg)
+        TrailingStopLossEngine.compute_new_sl(buy_state, 100.5, cfg)
         # 1% profit → step trail kicks in
-        sl2 = TrailingStopLossEngine.compute_new_sl(state, 101.0, cfg)
+        sl2 = TrailingStopLossEngine.compute_new_sl(buy_state, 101.0, cfg)
         assert sl2 is not None
 
-    def test_hybrid_tight_trail_phase(self):
-        state = TrailingStopLossEngine.create_state("H3", "BUY", 100.0, 95.0)
+    def test_hybrid_tight_trail_phase(self, buy_state):
         cfg = self._config(
             breakeven_trigger_pct=0.3,
             trail_pct=0.5,
             min_trail_pct=0.2,
         )
         # Trigger breakeven
-        TrailingStopLossEngine.compute_new_sl(state, 100.5, cfg)
+        TrailingStopLossEngine.compute_new_sl(buy_state, 100.5, cfg)
         # High profit → tight trail
-        sl = TrailingStopLossEngine.compute_new_sl(state, 103.0, cfg)
+        sl = TrailingStopLossEngine.compute_new_sl(buy_state, 103.0, cfg)
         assert sl is not None
 
-    def test_history_tracking(self):
-        state = TrailingStopLossEngine.create_state("H4", "BUY", 100.0, 95.0)
+    def test_step_trail_after_retrace_from_tight_band(self, buy_state):
+        """Reach +2%, retrace to +1.7% — the step lock still tightens the SL."""
+        cfg = self._config(
+            trail_pct=1.2, activation_pct=0.8, step_size_pct=0.8, step_lock_pct=0.5,
+            breakeven_trigger_pct=1.0, min_trail_pct=0.5,
+        )
+        TrailingStopLossEngine.compute_new_sl(buy_state, 101.0, cfg)  # breakeven
+        assert TrailingStopLossEngine.compute_new_sl(buy_state, 102.0, cfg) == 100.98
+        # 1.7% → step 2 → lock 2 x 0.5% = 101.0, tighter than the 100.98 trail
+        assert TrailingStopLossEngine.compute_new_sl(buy_state, 101.7, cfg) == 101.0
+
+    def test_history_tracking(self, buy_state):
         cfg = self._config(breakeven_trigger_pct=0.3)
-        TrailingStopLossEngine.compute_new_sl(state, 101.0, cfg)
-        assert len(state.history) >= 1
-        assert state.adjustments >= 1
-        entry = state.history[0]
-        assert "old_sl" in entry
-        assert "new_sl" in entry
-        assert "profit_pct" in entry
+        TrailingStopLossEngine.compute_new_sl(buy_state, 101.0, cfg)
+        assert len(buy_state.history) >= 1
+        assert buy_state.adjustments >= 1
+        entry = buy_state.history[0]
+        assert entry.old_sl == 95.0
+        assert entry.new_sl == buy_state.current_sl
+        assert entry.profit_pct == 1.0
+        d = TrailingStopLossEngine.state_to_dict(buy_state)
+        assert d["history"][0] == entry._asdict()
+
+
+class TestBatchCompute:
+    """Test compute_new_sl_batch over a tick batch."""
+
+    def test_batch_uses_latest_tick_per_symbol(self):
+        a = TrailingStopLossEngine.create_state("B1", "BUY", 100.0, 95.0)
+        b = TrailingStopLossEngine.create_state("B2", "SELL", 100.0, 105.0)
+        c = TrailingStopLossEngine.create_state("B3", "BUY", 50.0, 48.0)
+        cfg = TrailConfig(strategy=TrailStrategy.PERCENTAGE)
+        ticks = [("NIFTY", 100.5), ("NIFTY", 102.0), ("BANKNIFTY", 51.0)]
+        updates = TrailingStopLossEngine.compute_new_sl_batch(
+            {"NIFTY": [a, b], "SENSEX": [c]}, ticks, cfg,
+        )
+        assert set(updates) == {"B1"}  # B2 is underwater, SENSEX had no tick
+        assert updates["B1"] == a.current_sl
+        assert a.last_adjusted_price == 102.0
 
 
 class TestEdgeCases:
@@ -255,3 +285,11 @@ class TestEdgeCases:
             # Trail distance must respect min
             dist = ((102.0 - new_sl) / 102.0) * 100
             assert dist >= 0.19  # Allow small rounding tolerance
+
+    def test_omitted_config_uses_module_default(self):
+        """Omitting config behaves exactly like passing a fresh TrailConfig()."""
+        implicit = TrailingStopLossEngine.create_state("E3", "BUY", 100.0, 95.0)
+        explicit = TrailingStopLossEngine.create_state("E4", "BUY", 100.0, 95.0)
+        sl = TrailingStopLossEngine.compute_new_sl(implicit, 101.0)
+        assert sl is not None
+        assert sl == TrailingStopLossEngine.compute_new_sl(explicit, 101.0, TrailConfig())
@@ -1,58 +1,74 @@
 import asyncio
+import re
 import httpx
-from bs4 import BeautifulSoup
+from lxml import etree
 from fake_useragent import UserAgent
 
+# Loading the user-agent DB is the slow part — do it once per process
+_UA = UserAgent()
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_HEAD_BYTES = 4096
+
+# Browser-like request headers; only the User-Agent changes per call
+_BASE_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "none",
+    "Sec-Fetch-User": "?1",
+    "Cache-Control": "max-age=0",
+}
+
 async def test_trendlyne():
     url = "https://trendlyne.com/research-reports/buy/"
-    ua = UserAgent()
-    headers = {
-        "User-Agent": ua.random,
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.5",
-        "Connection": "keep-alive",
-        "Upgrade-Insecure-Requests": "1",
-        "Sec-Fetch-Dest": "document",
-        "Sec-Fetch-Mode": "navigate",
-        "Sec-Fetch-Site": "none",
-        "Sec-Fetch-User": "?1",
-        "Cache-Control": "max-age=0",
-    }
+    headers = {"User-Agent": _UA.random, **_BASE_HEADERS}
     
     print(f"Fetching {url} with headers...")
     async with httpx.AsyncClient(follow_redirects=True) as client:
         try:
-            response = await client.get(url, headers=headers, timeout=15.0)
-            print(f"Status Code: {response.status_code}")
-            
-            if response.status_code == 200:
-                print("Successfully fetched page.")
-                soup = BeautifulSoup(response.text, "lxml")
+            async with client.stream("GET", url, headers=headers, timeout=15.0) as response:
+                print(f"Status Code: {response.status_code}")
+                
+                if response.status_code != 200:
+                    print("Failed to fetch page.")
+                    await response.aread()
+                    print(f"Response: {response.text[:200]}")
+                    return
                 
-                # Try to find the table
-                # Based on typical structures, look for tables
-                tables = soup.find_all("table")
-                print(f"Found {len(tables)} tables.")
+                print("Successfully fetched page.")
+                # Parse as the body streams in and stop at the first closed table
+                parser = etree.HTMLPullParser(events=("end",), tag="table")
+                head = b""
+                async for chunk in response.aiter_bytes(65536):
+                    if len(head) < _HEAD_BYTES:
+                        head += chunk[:_HEAD_BYTES - len(head)]
+                    parser.feed(chunk)
+                    for _, table in parser.read_events():
+                        _print_table(table)
+                        return
                 
-                if tables:
-                    # Inspect the first table rows
-                    table = tables[0]
-                    rows = table.find_all("tr")
-                    print(f"Table has {len(rows)} rows.")
-                    
-                    # Print first few rows to see structure
-                    for i, row in enumerate(rows[:5]):
-                        cells = [c.get_text(strip=True) for c in row.find_all(["th", "td"])]
-                        print(f"Row {i}: {cells}")
-                else:
-                    print("No tables found. Dumping first 500 chars of body:")
-                    print(soup.body.get_text(strip=True)[:500] if soup.body else "No body")
-            else:
-                print("Failed to fetch page.")
-                print(f"Response: {response.text[:200]}")
+                # Diagnostic only — strip tags from the first few KB rather than walk the tree
+                print("No tables found. Dumping first 500 chars of page text:")
+                print(_TAG_RE.sub(" ", head.decode("utf-8", "replace")).strip()[:500] or "No body")
                 
         except Exception as e:
             print(f"Error: {e}")
 
+
+def _print_table(table):
+    """Inspect the first table rows"""
+    rows = list(table.iter("tr"))
+    print(f"Table has {len(rows)} rows.")
+    
+    # Print first few rows to see structure
+    for i, row in enumerate(rows[:5]):
+        cells = [c.xpath("string()").strip() for c in row.iter("th", "td")]
+        print(f"Row {i}: {cells}")
+
+
 if __name__ == "__main__":
     asyncio.run(test_trendlyne())
@@ -1,23 +1,39 @@
 import asyncio
-import sys
+import importlib.util
 import os
 import json
 import logging
-from unittest.mock import MagicMock
 import httpx
 
+try:
+    import orjson
+
+    def _dump_pretty(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:  # stdlib fallback — same layout, just slower
+    def _dump_pretty(obj) -> str:
+        return json.dumps(obj, indent=2)
+
 # Setup logging
 logging.basicConfig(level=logging.ERROR) # Quiet logs
 
-# Adjust path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "services/ingestion_service")))
-
 # Capture
 captured_payload = None
 
 # Save original before patching
 OriginalAsyncClient = httpx.AsyncClient
 
+class _EngineResponse:
+    """Stand-in for the engine's reply — PipelineRunner only reads status_code and json()."""
+    __slots__ = ()
+    status_code = 200
+
+    def json(self):
+        return {}
+
+
+_ENGINE_RESPONSE = _EngineResponse()
+
 # Spy Class
 class SpyClient:
     def __init__(self, *args, **kwargs):
@@ -42,16 +58,20 @@ class SpyClient:
         if "18004/generate" in str(url):
             print(f"\n[SpyClient] INTERCEPTED POST to {url}")
             captured_payload = json
-            mock_resp = MagicMock()
-            mock_resp.status_code = 200
-            return mock_resp
+            return _ENGINE_RESPONSE
         else:
             return await self.client.post(url, json=json, **kwargs)
 
 # Patch globally
 httpx.AsyncClient = SpyClient
 
-from pipeline_runner import PipelineRunner  # noqa: E402
+# Load pipeline_runner straight from its file (it sits next to this script)
+_spec = importlib.util.spec_from_file_location(
+    "pipeline_runner", os.path.join(os.path.dirname(os.path.abspath(__file__)), "pipeline_runner.py"),
+)
+_pipeline_runner = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_pipeline_runner)
+PipelineRunner = _pipeline_runner.PipelineRunner
 
 async def main():
     runner = PipelineRunner()
@@ -70,7 +90,7 @@ async def main():
                 "latest_revenue": captured_payload.get("financials", {}).get("income_statement", [])[-1].get("incTrev") if captured_payload.get("financials", {}).get("income_statement") else "N/A"
             }
         }
-        print(json.dumps(subset, indent=2))
+        print(_dump_pretty(subset))
         
         # Verify specific fields
         fund = captured_payload.get("fundamentals", {})